@@ -0,0 +1,309 @@
+"""Almacén persistente de tablas de amortización en SQLite (biblioteca estándar).
+
+Uso:
+    python almacen.py --base cartera.db cargar cartera.csv
+    python almacen.py --base cartera.db saldo 42 36
+    python almacen.py --base cartera.db abono 42 12 5000000 PLAZO
+
+Cada crédito se guarda con el hash de sus parámetros normalizados (lote.clave_prestamo):
+si vuelve a llegar sin cambios no se recalcula. Si solo cambian sus abonos, se reescriben
+únicamente las filas desde el primer período afectado. Las filas viven en una tabla
+WITHOUT ROWID con clave primaria (prestamo_id, periodo), de modo que consultar el saldo de
+un crédito en un período es una sola búsqueda en el índice, aun con millones de filas.
+"""
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+from collections import Counter
+from itertools import repeat
+from typing import Dict, Iterable, List, Optional
+
+from calendario import formatear
+from financiero import Abono
+from lote import calcular_prestamo, clave_prestamo, leer_cartera, normalizar_prestamo
+from tabla import COLUMNAS, TablaAmortizacion
+
+TAMANO_LOTE = 500 # Créditos por transacción al cargar una cartera
+
+# Resultado de guardar un crédito
+NUEVO = 'nuevo'
+SIN_CAMBIOS = 'sin_cambios'
+PARCIAL = 'parcial'       # Solo cambiaron los abonos: se reescribieron las filas afectadas
+COMPLETO = 'completo'     # Cambiaron los parámetros base: se reescribió la tabla entera
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS prestamos (
+    id TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    parametros TEXT NOT NULL,
+    actualizado REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS filas (
+    prestamo_id TEXT NOT NULL,
+    periodo INTEGER NOT NULL,
+    fecha INTEGER NOT NULL,
+    saldo_inicial REAL NOT NULL,
+    interes REAL NOT NULL,
+    cuota_original REAL NOT NULL,
+    cuota_pagada REAL NOT NULL,
+    amortizacion REAL NOT NULL,
+    abono_adhoc REAL NOT NULL,
+    saldo_final REAL NOT NULL,
+    recalculado INTEGER NOT NULL,
+    PRIMARY KEY (prestamo_id, periodo)
+) WITHOUT ROWID;
+"""
+
+_INSERTAR_FILA = f"INSERT OR REPLACE INTO filas (prestamo_id, {', '.join(COLUMNAS)}) VALUES ({', '.join('?' * (len(COLUMNAS) + 1))})"
+_SELECCIONAR_FILAS = f"SELECT {', '.join(COLUMNAS)} FROM filas WHERE prestamo_id = ?"
+
+
+def hash_parametros(prestamo: Dict) -> str:
+    """Hash SHA-256 de los parámetros normalizados del crédito (sin su id)."""
+    return hashlib.sha256(clave_prestamo(prestamo).encode('utf-8')).hexdigest()
+
+
+def _primer_periodo_afectado(anterior: Dict, nuevo: Dict) -> Optional[int]:
+    """Primer período cuyo cálculo cambia si solo difieren los abonos; None si cambió la base."""
+    if any(anterior[k] != nuevo[k] for k in nuevo if k not in ('id', 'abonos')):
+        return None
+    anteriores = Counter(map(tuple, anterior['abonos']))
+    nuevos = Counter(map(tuple, nuevo['abonos']))
+    distintos = (anteriores - nuevos) + (nuevos - anteriores)
+    return min(abono[0] for abono in distintos) if distintos else None
+
+
+def _prestamo_guardado(prestamo_id: str, parametros: str) -> Dict:
+    prestamo = json.loads(parametros)
+    prestamo['id'] = prestamo_id
+    prestamo['abonos'] = [Abono(*abono) for abono in prestamo['abonos']]
+    return prestamo
+
+
+class AlmacenTablas:
+    """Tablas de amortización de una cartera guardadas en un archivo SQLite."""
+
+    def __init__(self, ruta: str = ':memory:'):
+        self.ruta = ruta
+        self._conexion = sqlite3.connect(ruta, isolation_level=None) # Transacciones explícitas
+        self._conexion.execute('PRAGMA journal_mode = WAL')
+        self._conexion.execute('PRAGMA synchronous = NORMAL')
+        self._conexion.execute('PRAGMA temp_store = MEMORY')
+        self._conexion.execute('PRAGMA cache_size = -65536') # 64 MiB de páginas en memoria
+        self._conexion.executescript(_ESQUEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.cerrar()
+
+    def cerrar(self):
+        self._conexion.close()
+
+    # --- Escritura ---
+
+    def _guardar(self, prestamo: Dict) -> str:
+        """Guarda un crédito normalizado dentro de la transacción en curso."""
+        con = self._conexion
+        clave = hash_parametros(prestamo)
+        previo = con.execute('SELECT hash, parametros FROM prestamos WHERE id = ?', (prestamo['id'],)).fetchone()
+        if previo is not None and previo[0] == clave:
+            return SIN_CAMBIOS
+
+        tabla = calcular_prestamo(prestamo)
+        desde = None if previo is None else _primer_periodo_afectado(_prestamo_guardado(prestamo['id'], previo[1]), prestamo)
+        if previo is None:
+            estado = NUEVO
+        elif desde is None:
+            estado = COMPLETO
+            con.execute('DELETE FROM filas WHERE prestamo_id = ?', (prestamo['id'],))
+        else:
+            # Las filas anteriores a `desde` no cambian: se borran y reinsertan solo las siguientes
+            estado = PARCIAL
+            con.execute('DELETE FROM filas WHERE prestamo_id = ? AND periodo >= ?', (prestamo['id'], desde))
+            inicio = next((i for i, periodo in enumerate(tabla.columna('periodo')) if periodo >= desde), len(tabla))
+            tabla = tabla[inicio:]
+
+        columnas = [tabla.columna(col) for col in COLUMNAS]
+        con.executemany(_INSERTAR_FILA, zip(repeat(prestamo['id']), *columnas))
+        con.execute('INSERT OR REPLACE INTO prestamos (id, hash, parametros, actualizado) VALUES (?, ?, ?, ?)',
+                    (prestamo['id'], clave, clave_prestamo(prestamo), time.time()))
+        return estado
+
+    def guardar(self, prestamo: Dict) -> str:
+        """Guarda un crédito normalizado (ver lote.normalizar_prestamo).
+
+        Devuelve NUEVO, SIN_CAMBIOS, PARCIAL o COMPLETO según lo que hubo que recalcular.
+        """
+        with self._transaccion():
+            return self._guardar(prestamo)
+
+    def guardar_cartera(self, registros: Iterable[Dict], tamano_lote: int = TAMANO_LOTE,
+                        errores: Optional[List[tuple]] = None) -> Dict[str, int]:
+        """Normaliza y guarda los registros de una cartera en transacciones de `tamano_lote` créditos.
+
+        Los registros inválidos o que el motor rechaza (incluidas las líneas ilegibles, que
+        lote.leer_cartera entrega como registros con error) se cuentan como 'errores' y no
+        interrumpen la carga: cada uno se deshace solo (SAVEPOINT) y, si se pasa la lista
+        `errores`, se agrega a ella como (número de registro, id, mensaje). Si el lector
+        mismo falla, se conserva lo ya guardado y la falla se cuenta como un error más.
+        """
+        conteo = Counter({NUEVO: 0, SIN_CAMBIOS: 0, PARCIAL: 0, COMPLETO: 0, 'errores': 0})
+        con = self._conexion
+        registros = iter(registros)
+        numero = 0
+        while True:
+            with self._transaccion():
+                while True:
+                    try:
+                        registro = next(registros)
+                    except StopIteration:
+                        return dict(conteo)
+                    except Exception as e:
+                        # El lector no puede continuar: se confirma el lote en curso y termina la carga
+                        conteo['errores'] += 1
+                        if errores is not None:
+                            errores.append((numero + 1, str(numero + 1), str(e)))
+                        return dict(conteo)
+                    numero += 1
+                    con.execute('SAVEPOINT registro')
+                    try:
+                        conteo[self._guardar(normalizar_prestamo(registro, numero))] += 1
+                    except Exception as e:
+                        con.execute('ROLLBACK TO registro')
+                        conteo['errores'] += 1
+                        if errores is not None:
+                            id_registro = registro.get('id') if isinstance(registro, dict) else None
+                            errores.append((numero, str(id_registro or numero), str(e)))
+                    con.execute('RELEASE registro')
+                    if numero % tamano_lote == 0:
+                        break
+
+    def aplicar_abono(self, prestamo_id: str, abono: Abono) -> str:
+        """Agrega un abono al crédito guardado y reescribe solo las filas desde su período."""
+        prestamo = self.prestamo(prestamo_id)
+        if prestamo is None:
+            raise KeyError(f"Crédito {prestamo_id} no encontrado.")
+        prestamo['abonos'] = prestamo['abonos'] + [abono]
+        return self.guardar(prestamo)
+
+    def eliminar(self, prestamo_id: str):
+        with self._transaccion():
+            self._conexion.execute('DELETE FROM filas WHERE prestamo_id = ?', (prestamo_id,))
+            self._conexion.execute('DELETE FROM prestamos WHERE id = ?', (prestamo_id,))
+
+    def _transaccion(self):
+        return _Transaccion(self._conexion)
+
+    # --- Consulta ---
+
+    def prestamo(self, prestamo_id: str) -> Optional[Dict]:
+        """Parámetros normalizados con que se calculó el crédito, o None si no existe."""
+        fila = self._conexion.execute('SELECT parametros FROM prestamos WHERE id = ?', (prestamo_id,)).fetchone()
+        return None if fila is None else _prestamo_guardado(prestamo_id, fila[0])
+
+    def ids(self) -> List[str]:
+        return [fila[0] for fila in self._conexion.execute('SELECT id FROM prestamos ORDER BY id')]
+
+    def fila(self, prestamo_id: str, periodo: int) -> Optional[Dict]:
+        """Fila de un período (fecha en texto YYYY-MM-DD), o None si no existe."""
+        valores = self._conexion.execute(_SELECCIONAR_FILAS + ' AND periodo = ?', (prestamo_id, periodo)).fetchone()
+        if valores is None:
+            return None
+        fila = dict(zip(COLUMNAS, valores))
+        fila['fecha'] = formatear(fila['fecha'])
+        fila['recalculado'] = bool(fila['recalculado'])
+        return fila
+
+    def saldo_en(self, prestamo_id: str, periodo: int) -> Optional[float]:
+        """Saldo del crédito al cierre de `periodo` (0 para el monto inicial); None si no existe."""
+        if periodo == 0:
+            prestamo = self.prestamo(prestamo_id)
+            return None if prestamo is None else prestamo['monto']
+        valor = self._conexion.execute('SELECT saldo_final FROM filas WHERE prestamo_id = ? AND periodo = ?',
+                                       (prestamo_id, periodo)).fetchone()
+        if valor is not None:
+            return valor[0]
+        # Después del último período el crédito ya está pagado
+        ultimo = self._conexion.execute('SELECT MAX(periodo) FROM filas WHERE prestamo_id = ?', (prestamo_id,)).fetchone()[0]
+        return 0.0 if ultimo is not None and periodo > ultimo else None
+
+    def tabla(self, prestamo_id: str, desde: int = 1, hasta: Optional[int] = None) -> TablaAmortizacion:
+        """Tabla guardada del crédito (o el rango de períodos indicado), en orden de período."""
+        consulta = _SELECCIONAR_FILAS + ' AND periodo >= ?'
+        argumentos = [prestamo_id, desde]
+        if hasta is not None:
+            consulta += ' AND periodo <= ?'
+            argumentos.append(hasta)
+        tabla = TablaAmortizacion()
+        for valores in self._conexion.execute(consulta + ' ORDER BY periodo', argumentos):
+            tabla.agregar(*valores)
+        return tabla
+
+    def estadisticas(self) -> Dict[str, int]:
+        prestamos = self._conexion.execute('SELECT COUNT(*) FROM prestamos').fetchone()[0]
+        filas = self._conexion.execute('SELECT COUNT(*) FROM filas').fetchone()[0]
+        return {'prestamos': prestamos, 'filas': filas}
+
+
+class _Transaccion:
+    """BEGIN/COMMIT explícitos; ROLLBACK si el bloque falla."""
+
+    def __init__(self, conexion: sqlite3.Connection):
+        self._conexion = conexion
+
+    def __enter__(self):
+        self._conexion.execute('BEGIN')
+
+    def __exit__(self, tipo, *_):
+        self._conexion.execute('ROLLBACK' if tipo else 'COMMIT')
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Almacén SQLite de tablas de amortización.")
+    parser.add_argument('--base', default='cartera.db', help="Archivo SQLite.")
+    ordenes = parser.add_subparsers(dest='orden', required=True)
+    cargar = ordenes.add_parser('cargar', help="Guardar una cartera CSV o JSONL (solo recalcula lo que cambió).")
+    cargar.add_argument('cartera')
+    cargar.add_argument('--lote', type=int, default=TAMANO_LOTE, help="Créditos por transacción.")
+    saldo = ordenes.add_parser('saldo', help="Saldo de un crédito al cierre de un período.")
+    saldo.add_argument('id')
+    saldo.add_argument('periodo', type=int)
+    abono = ordenes.add_parser('abono', help="Agregar un abono extraordinario a un crédito guardado.")
+    abono.add_argument('id')
+    abono.add_argument('periodo', type=int)
+    abono.add_argument('monto', type=float)
+    abono.add_argument('opcion', choices=['PLAZO', 'CUOTA'], type=str.upper)
+    args = parser.parse_args(argv)
+
+    with AlmacenTablas(args.base) as almacen:
+        inicio = time.perf_counter()
+        if args.orden == 'cargar':
+            errores = []
+            conteo = almacen.guardar_cartera(leer_cartera(args.cartera), args.lote, errores)
+            print(f"{conteo} en {time.perf_counter() - inicio:.2f} s; {almacen.estadisticas()}")
+            for numero, id_registro, mensaje in errores:
+                print(f"Registro {numero} (id {id_registro}): {mensaje}", file=sys.stderr)
+            return 1 if conteo['errores'] else 0
+        if args.orden == 'saldo':
+            valor = almacen.saldo_en(args.id, args.periodo)
+            if valor is None:
+                print(f"Sin datos para el crédito {args.id} en el período {args.periodo}.", file=sys.stderr)
+                return 1
+            print(f"{valor:,.2f} ({(time.perf_counter() - inicio) * 1000:.2f} ms)")
+            return 0
+        try:
+            estado = almacen.aplicar_abono(args.id, Abono(args.periodo, args.monto, args.opcion))
+        except (KeyError, ValueError, IndexError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        print(f"Crédito {args.id}: {estado} ({(time.perf_counter() - inicio) * 1000:.2f} ms)")
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""Mediciones de rendimiento y verificación de regresión del motor financiero.
+
+Uso:
+    python benchmark.py                      # verificación + mediciones completas
+    python benchmark.py --solo-verificar     # solo verifica (CSV de referencia y equivalencias)
+    python benchmark.py --solo-verificar --creditos 1000   # más créditos aleatorios
+    python benchmark.py --anios 1 5 30 --repeticiones 5 --json resultados.json
+    python benchmark.py --anios 30 --perfil benchmark.prof   # captura cProfile/tracemalloc
+
+La verificación regenera los dos CSV incluidos en el proyecto ("Nominal - Abono
+Extraordinario - Reducir Plazo" y "Efectiva - Abono Extraordinario - Reducir Cuota") y
+compara su contenido (sin distinguir el fin de línea). Además compara los motores
+alternativos (cartera, TablaPerezosa, en_centavos, aplicar_abonos_y_recalcular y
+escenarios) con el motor original sobre créditos aleatorios (ver equivalencias.py). Si
+algo difiere, el programa termina con código 1.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+from typing import Callable, Dict, List
+
+import equivalencias
+import financiero
+import instrumentacion
+from financiero import FRECUENCIAS_ANUALES
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+# Parámetros con los que se generaron los archivos de referencia
+CASOS_REFERENCIA = [
+    {
+        'archivo': "Nominal - Abono Extraordinario - Reducir Plazo .csv",
+        'monto': 100000000.0, 'tasa': 0.15, 'tipo_tasa': 'NOMINAL', 'plazo': 60, 'frecuencia': 12,
+        'fecha_inicio': date(2025, 11, 7), 'periodo_abono': 12, 'monto_abono': 2000000.0, 'opcion': 'PLAZO',
+    },
+    {
+        'archivo': "Efectiva - Abono Extraordinario - Reducir Cuota.csv",
+        'monto': 65000000.0, 'tasa': 0.15, 'tipo_tasa': 'EFECTIVA', 'plazo': 60, 'frecuencia': 12,
+        'fecha_inicio': date(2025, 11, 7), 'periodo_abono': 12, 'monto_abono': 2000000.0, 'opcion': 'CUOTA',
+    },
+]
+
+# Crédito usado en las mediciones (varía el plazo y la frecuencia)
+MONTO = 100000000.0
+TASA = 0.15
+TIPO_TASA = 'NOMINAL'
+FECHA_INICIO = date(2025, 1, 1)
+FILAS_VISTA = 20 # Items de la tabla virtual en las mediciones de la vista
+
+
+def verificar_referencias() -> List[str]:
+    """Regenera los CSV de referencia y devuelve la lista de archivos que difieren."""
+    fallas = []
+    for caso in CASOS_REFERENCIA:
+        tasa_per = financiero.calcular_tasa_periodica(caso['tasa'], caso['frecuencia'], caso['tipo_tasa'])
+        cuota = financiero.calcular_cuota_constante(caso['monto'], tasa_per, caso['plazo'])
+        tabla = financiero.generar_tabla_base(caso['monto'], tasa_per, cuota, caso['plazo'],
+                                              caso['frecuencia'], caso['fecha_inicio'])
+        tabla = financiero.aplicar_abono_y_recalcular(tabla, caso['periodo_abono'], caso['monto_abono'],
+                                                      caso['opcion'], tasa_per, caso['plazo'], caso['frecuencia'])
+        with tempfile.TemporaryDirectory() as directorio:
+            generado = os.path.join(directorio, 'tabla.csv')
+            financiero.exportar_tabla_csv(tabla, generado)
+            # Modo texto: los archivos de referencia usan fin de línea \n y csv escribe \r\n
+            with open(generado, encoding='utf-8') as a, open(os.path.join(DIRECTORIO, caso['archivo']), encoding='utf-8') as b:
+                if a.read() != b.read():
+                    fallas.append(caso['archivo'])
+    return fallas
+
+
+def _medir(funcion: Callable, preparar: Callable, repeticiones: int) -> Dict:
+    """Mejor tiempo de `funcion(preparar())` y pico de memoria de una ejecución aparte."""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        argumento = preparar()
+        inicio = time.perf_counter()
+        funcion(argumento)
+        mejor = min(mejor, time.perf_counter() - inicio)
+
+    # La memoria se mide en otra ejecución para no distorsionar el tiempo; si tracemalloc
+    # ya está activo (captura con --perfil), se mide desde el uso actual
+    argumento = preparar()
+    previo = tracemalloc.is_tracing()
+    if not previo:
+        tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    funcion(argumento)
+    pico = tracemalloc.get_traced_memory()[1] - base
+    if not previo:
+        tracemalloc.stop()
+    return {'segundos': mejor, 'memoria_pico': pico}
+
+
+def _crear_vista():
+    """Crea una ventana oculta para las tablas virtuales; None si no hay pantalla disponible."""
+    try:
+        import tkinter as tk
+        raiz = tk.Tk()
+        raiz.withdraw()
+        return raiz
+    except Exception:
+        return None
+
+
+def _tabla_virtual_nueva(raiz, tabla=None, periodo: int = 1):
+    """TablaVirtual recién creada (reemplaza a la anterior); con `tabla`, ya mostrada desde `periodo`."""
+    from tkinter import ttk
+    from vista_tabla import TablaVirtual
+    for hijo in raiz.winfo_children():
+        hijo.destroy()
+    marco = ttk.Frame(raiz)
+    marco.pack(fill='both', expand=True)
+    tabla_virtual = TablaVirtual(marco, filas_visibles=FILAS_VISTA)
+    if tabla is not None:
+        tabla_virtual.mostrar(tabla)
+        tabla_virtual.ir_a_periodo(periodo)
+    raiz.update_idletasks()
+    return tabla_virtual
+
+
+def medir(anios: List[int], repeticiones: int, incluir_vista: bool = True) -> List[Dict]:
+    """Mide cada operación para todas las frecuencias y plazos indicados.
+
+    En las operaciones de la vista, 'filas' son los items visibles que se refrescan (el
+    resto de la tabla no se toca), no el plazo.
+    """
+    resultados = []
+    raiz = _crear_vista() if incluir_vista else None
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo_csv = os.path.join(directorio, 'benchmark.csv')
+        for nombre_frecuencia, frecuencia in FRECUENCIAS_ANUALES.items():
+            tasa_per = financiero.calcular_tasa_periodica(TASA, frecuencia, TIPO_TASA)
+            for n_anios in anios:
+                plazo = n_anios * frecuencia
+                cuota = financiero.calcular_cuota_constante(MONTO, tasa_per, plazo)
+                base = financiero.generar_tabla_base(MONTO, tasa_per, cuota, plazo, frecuencia, FECHA_INICIO)
+                periodo_abono = max(1, plazo // 3)
+                monto_abono = MONTO * 0.05
+
+                operaciones = {
+                    'generar_tabla_base': (
+                        lambda _: financiero.generar_tabla_base(MONTO, tasa_per, cuota, plazo, frecuencia, FECHA_INICIO),
+                        lambda: None),
+                    'generar_tabla_centavos': (
+                        lambda _: financiero.generar_tabla_base(MONTO, tasa_per, cuota, plazo, frecuencia, FECHA_INICIO,
+                                                                en_centavos=True),
+                        lambda: None),
+                    'abono_plazo': (
+                        lambda tabla: financiero.aplicar_abono_y_recalcular(
+                            tabla, periodo_abono, monto_abono, 'PLAZO', tasa_per, plazo, frecuencia),
+                        lambda: base[:]),
+                    'abono_cuota': (
+                        lambda tabla: financiero.aplicar_abono_y_recalcular(
+                            tabla, periodo_abono, monto_abono, 'CUOTA', tasa_per, plazo, frecuencia),
+                        lambda: base[:]),
+                    'exportar_tabla_csv': (
+                        lambda tabla: financiero.exportar_tabla_csv(tabla, archivo_csv),
+                        lambda: base),
+                }
+                filas_operacion = {}
+                if raiz is not None:
+                    con_abono = financiero.aplicar_abono_y_recalcular(
+                        base[:], periodo_abono, monto_abono, 'PLAZO', tasa_per, plazo, frecuencia)
+
+                    def refrescar(tabla_virtual, tabla, desde=None):
+                        tabla_virtual.mostrar(tabla, desde)
+                        raiz.update_idletasks()
+
+                    # Primera presentación: se formatean y envían a Tk todos los items visibles
+                    operaciones['vista_completa'] = (
+                        lambda tabla_virtual: refrescar(tabla_virtual, base),
+                        lambda: _tabla_virtual_nueva(raiz))
+                    # Tras un abono, con la ventana en el período del abono: cambian las filas recalculadas
+                    operaciones['vista_desde_abono'] = (
+                        lambda tabla_virtual: refrescar(tabla_virtual, con_abono, periodo_abono),
+                        lambda: _tabla_virtual_nueva(raiz, base, periodo_abono))
+                    filas_operacion = dict.fromkeys(('vista_completa', 'vista_desde_abono'), min(FILAS_VISTA, plazo))
+
+                for operacion, (funcion, preparar) in operaciones.items():
+                    medicion = _medir(funcion, preparar, repeticiones)
+                    filas = filas_operacion.get(operacion, plazo)
+                    medicion.update({
+                        'operacion': operacion,
+                        'frecuencia': nombre_frecuencia,
+                        'anios': n_anios,
+                        'filas': filas,
+                        'filas_por_segundo': filas / medicion['segundos'] if medicion['segundos'] > 0 else 0.0,
+                    })
+                    resultados.append(medicion)
+
+    if raiz is not None:
+        raiz.destroy()
+    return resultados
+
+
+def imprimir(resultados: List[Dict]):
+    print(f"{'operación':<24} {'frecuencia':<16} {'años':>4} {'filas':>6} {'ms':>10} {'filas/s':>12} {'memoria KiB':>12}")
+    for r in resultados:
+        print(f"{r['operacion']:<24} {r['frecuencia']:<16} {r['anios']:>4} {r['filas']:>6} "
+              f"{r['segundos'] * 1000:>10.3f} {r['filas_por_segundo']:>12,.0f} {r['memoria_pico'] / 1024:>12,.1f}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Mediciones y verificación de regresión del motor financiero.")
+    parser.add_argument('--anios', type=int, nargs='+', default=[1, 5, 15, 30], help="Plazos a medir, en años.")
+    parser.add_argument('--repeticiones', type=int, default=3, help="Repeticiones por medición (se toma la mejor).")
+    parser.add_argument('--solo-verificar', action='store_true', help="Solo verificar, sin mediciones.")
+    parser.add_argument('--creditos', type=int, default=equivalencias.CREDITOS,
+                        help="Créditos aleatorios por comprobación de equivalencia.")
+    parser.add_argument('--sin-vista', action='store_true', help="No medir el refresco de la tabla en la interfaz.")
+    parser.add_argument('--json', help="Guardar las mediciones en este archivo JSON.")
+    parser.add_argument('--perfil', help="Medir bajo cProfile y tracemalloc y guardar el perfil en este archivo.")
+    args = parser.parse_args(argv)
+
+    fallas = verificar_referencias()
+    for archivo in fallas:
+        print(f"REGRESIÓN: el resultado no coincide con '{archivo}'")
+    if not fallas:
+        print(f"Verificación: {len(CASOS_REFERENCIA)} archivos de referencia coinciden.")
+    for nombre, diferencias in equivalencias.verificar_equivalencias(args.creditos).items():
+        if diferencias is None:
+            print(f"Equivalencia {nombre}: omitida (requiere numpy).")
+            continue
+        for diferencia in diferencias:
+            print(f"REGRESIÓN: {diferencia}")
+        if not diferencias:
+            print(f"Equivalencia {nombre}: {args.creditos} créditos aleatorios coinciden.")
+        fallas.extend(diferencias)
+    if args.solo_verificar:
+        return 1 if fallas else 0
+
+    if args.perfil:
+        with instrumentacion.capturar(args.perfil) as captura:
+            resultados = medir(args.anios, args.repeticiones, incluir_vista=not args.sin_vista)
+        print(captura.informe())
+    else:
+        resultados = medir(args.anios, args.repeticiones, incluir_vista=not args.sin_vista)
+    imprimir(resultados)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as archivo:
+            json.dump({'verificacion_ok': not fallas, 'mediciones': resultados}, archivo, indent=2, ensure_ascii=False)
+    return 1 if fallas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
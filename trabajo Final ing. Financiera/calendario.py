@@ -0,0 +1,107 @@
+from calendar import monthrange
+from datetime import date
+from functools import lru_cache
+from typing import Sequence, Tuple
+
+# Modos de calendario de pagos:
+# - 'dias': salto fijo de round(365 / frecuencia) días (comportamiento original del motor)
+# - 'calendario': meses reales (mismo día del mes, ajustado al último día si no existe),
+#   quincenas (día d y d + 15 de cada mes) y semanas de 7 días
+MODO_DIAS = 'dias'
+MODO_CALENDARIO = 'calendario'
+MODOS_FECHAS = (MODO_DIAS, MODO_CALENDARIO)
+
+# Frecuencias anuales que se pagan en meses completos y cuántos meses dura cada período
+MESES_POR_PERIODO = {12: 1, 6: 2, 4: 3, 2: 6, 1: 12}
+
+TAMANO_CACHE = 256 # Máximo de secuencias de fechas memorizadas
+
+
+def salto_dias(frecuencia_pago: int) -> int:
+    """Días entre pagos en el modo 'dias'."""
+    return round(365 / frecuencia_pago)
+
+
+@lru_cache(maxsize=None)
+def _dias_mes(anio: int, mes: int) -> int:
+    return monthrange(anio, mes)[1]
+
+
+def _ordinal_mes(anio: int, mes0: int, dia: int) -> int:
+    """Ordinal del día `dia` del mes (mes0 desde 0, puede exceder 11), ajustado al fin de mes."""
+    anio, mes0 = anio + mes0 // 12, mes0 % 12
+    return date(anio, mes0 + 1, min(dia, _dias_mes(anio, mes0 + 1))).toordinal()
+
+
+def _validar_modo(modo: str):
+    if modo not in MODOS_FECHAS:
+        raise ValueError(f"Modo de fechas no reconocido. Use: {', '.join(MODOS_FECHAS)}.")
+
+
+def fechas_pago(fecha_inicio: date, frecuencia_pago: int, n_periodos: int, modo: str = MODO_DIAS) -> Tuple[int, ...]:
+    """Ordinales de las fechas de los períodos 1..n (el período 1 vence en fecha_inicio).
+
+    Las secuencias se memorizan por (fecha_inicio, frecuencia, n, modo); para obtener
+    datetime64 use exportacion.ordinales_a_datetime64. El texto YYYY-MM-DD se genera solo
+    al exportar o mostrar la fila.
+    """
+    _validar_modo(modo)
+    return _fechas_pago(fecha_inicio.toordinal(), frecuencia_pago, n_periodos, modo)
+
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def _fechas_pago(inicio: int, frecuencia_pago: int, n_periodos: int, modo: str) -> Tuple[int, ...]:
+    salto = _salto_fijo(frecuencia_pago, modo)
+    if salto:
+        return tuple(range(inicio, inicio + salto * n_periodos, salto))
+    fecha = date.fromordinal(inicio)
+    return tuple(_ordinal_calendario(fecha, frecuencia_pago, k) for k in range(n_periodos))
+
+
+def fecha_periodo(fecha_inicio: date, frecuencia_pago: int, periodo: int, modo: str = MODO_DIAS) -> int:
+    """Ordinal de la fecha de un solo período, sin generar la secuencia completa."""
+    _validar_modo(modo)
+    salto = _salto_fijo(frecuencia_pago, modo)
+    if salto:
+        return fecha_inicio.toordinal() + (periodo - 1) * salto
+    return _ordinal_calendario(fecha_inicio, frecuencia_pago, periodo - 1)
+
+
+def _salto_fijo(frecuencia_pago: int, modo: str) -> int:
+    """Días entre pagos si el calendario avanza en días fijos; 0 si avanza por meses."""
+    if modo == MODO_DIAS or (frecuencia_pago not in MESES_POR_PERIODO and frecuencia_pago not in (24, 52)):
+        return salto_dias(frecuencia_pago)
+    if frecuencia_pago == 52:
+        return 7
+    return 0
+
+
+def _ordinal_calendario(fecha_inicio: date, frecuencia_pago: int, k: int) -> int:
+    """Ordinal del pago k (desde 0) en meses reales o quincenas."""
+    anio, mes0, dia = fecha_inicio.year, fecha_inicio.month - 1, fecha_inicio.day
+    if frecuencia_pago == 24:
+        # Quincenas: el día de inicio y quince días después, dentro del mismo mes si cabe
+        mes0 += k // 2
+        if k % 2 == 0:
+            return _ordinal_mes(anio, mes0, dia)
+        if dia <= 15:
+            return _ordinal_mes(anio, mes0, dia + 15)
+        return _ordinal_mes(anio, mes0 + 1, dia - 15)
+    return _ordinal_mes(anio, mes0 + k * MESES_POR_PERIODO[frecuencia_pago], dia)
+
+
+def fecha_siguiente(fechas: Sequence[int], periodo: int, frecuencia_pago: int) -> int:
+    """Ordinal del período `periodo` tomado de `fechas`; más allá del final, salta en días."""
+    if periodo <= len(fechas):
+        return fechas[periodo - 1]
+    return fechas[-1] + (periodo - len(fechas)) * salto_dias(frecuencia_pago)
+
+
+def formatear(ordinal: int) -> str:
+    """Texto YYYY-MM-DD de un ordinal (solo para exportar o mostrar)."""
+    return date.fromordinal(ordinal).isoformat()
+
+
+def estadisticas_cache():
+    """Aciertos, fallos y tamaño de la caché de secuencias de fechas."""
+    return _fechas_pago.cache_info()._asdict()
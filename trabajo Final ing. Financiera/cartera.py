@@ -0,0 +1,64 @@
+import numpy as np
+from typing import Dict
+
+from financiero import CERO_FINANCIERO
+from vectorial import redondear
+
+# Columnas 2-D (préstamos x períodos) que produce el motor vectorizado.
+COLUMNAS_CARTERA = ('saldo_inicial', 'interes', 'cuota_pagada', 'amortizacion', 'saldo_final')
+
+
+def generar_tablas_cartera(principales, tasas_per, cuotas, n_periodos,
+                           cierre_anticipado: bool = True) -> Dict[str, np.ndarray]:
+    """Genera en un solo recorrido vectorizado las tablas de amortización de muchos préstamos.
+
+    Replica fila a fila a `financiero.generar_tabla_base`: mismo redondeo y mismo ajuste de
+    cierre en la última cuota. Las celdas posteriores al plazo de cada préstamo quedan en
+    cero y se marcan en la máscara 'activo'. Con cierre_anticipado=False el crédito solo
+    cierra en su último período, como el régimen CUOTA de financiero.aplicar_abonos_y_recalcular.
+    """
+    principales, tasas_per, cuotas, n_periodos = (
+        np.atleast_1d(a).ravel() for a in np.broadcast_arrays(
+            np.asarray(principales, dtype=float),
+            np.asarray(tasas_per, dtype=float),
+            np.asarray(cuotas, dtype=float),
+            np.asarray(n_periodos, dtype=np.int64),
+        )
+    )
+    if np.any(n_periodos <= 0):
+        raise ValueError("El número de períodos debe ser positivo para todos los préstamos.")
+
+    n_prestamos = principales.shape[0]
+    max_periodos = int(n_periodos.max()) if n_prestamos else 0
+    forma = (n_prestamos, max_periodos)
+    tablas = {col: np.zeros(forma) for col in COLUMNAS_CARTERA}
+
+    saldo = principales.copy()
+    for t in range(max_periodos):
+        activo = t < n_periodos
+        es_ultimo = n_periodos == t + 1
+
+        interes = redondear(saldo * tasas_per)
+        amortizacion = redondear(cuotas - interes)
+        saldo_final = redondear(saldo - amortizacion)
+        cuota_periodo = cuotas
+
+        # Cierre exacto: última cuota o amortización mayor al saldo
+        cierre = es_ultimo | (cierre_anticipado & (saldo_final < CERO_FINANCIERO))
+        amortizacion = np.where(cierre, saldo, amortizacion)
+        cuota_periodo = np.where(cierre, amortizacion + interes, cuota_periodo)
+        saldo_final = np.where(cierre, 0.0, saldo_final)
+
+        tablas['saldo_inicial'][:, t] = np.where(activo, redondear(saldo), 0.0)
+        tablas['interes'][:, t] = np.where(activo, interes, 0.0)
+        tablas['cuota_pagada'][:, t] = np.where(activo, redondear(cuota_periodo), 0.0)
+        tablas['amortizacion'][:, t] = np.where(activo, amortizacion, 0.0)
+        tablas['saldo_final'][:, t] = np.where(activo, saldo_final, 0.0)
+
+        saldo = np.where(activo, saldo_final, saldo)
+
+    tablas['activo'] = np.arange(1, max_periodos + 1) <= n_periodos[:, None]
+    tablas['periodo'] = np.arange(1, max_periodos + 1)
+    tablas['cuota_original'] = cuotas.copy()
+    tablas['n_periodos'] = n_periodos.copy()
+    return tablas
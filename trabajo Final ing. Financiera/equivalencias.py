@@ -0,0 +1,416 @@
+"""Verificación de equivalencia de los motores alternativos contra el motor de referencia.
+
+El motor de referencia es generar_tabla_base seguido de llamadas encadenadas a
+aplicar_abono_y_recalcular (el mismo camino que reproducen los CSV de referencia). Sobre
+créditos aleatorios (semilla fija) se comparan:
+
+- cartera.generar_tablas_cartera (numpy), fila a fila;
+- TablaPerezosa: saldo_en, interes_acumulado, fila y materializar;
+- generar_tabla_base y aplicar_abonos_y_recalcular con en_centavos=True, que solo pueden
+  diferir a partir de un interés que cae en un empate de medio centavo;
+- aplicar_abonos_y_recalcular, descontando las diferencias documentadas en su docstring;
+- escenarios.barrer_escenarios (numpy), dentro de su TOLERANCIA_RELATIVA;
+- objetivos (numpy): tasa -> cuota -> tasa, plazo_para_cuota y abono_para_cuota mínimos;
+- calendario: fechas de la tabla en ambos modos contra las reglas de cada modo;
+- exportacion (numpy): las tablas leídas de .npy son iguales a las exportadas;
+- almacen: la tabla guardada tras cada aplicar_abono (reescritura parcial) es la que da
+  lote.calcular_prestamo.
+
+benchmark.py --solo-verificar ejecuta estas comprobaciones junto con los CSV de referencia.
+"""
+import os
+import random
+import tempfile
+from calendar import monthrange
+from datetime import date
+from typing import Dict, List, Optional
+
+import calendario
+import financiero
+from calendario import MESES_POR_PERIODO, MODO_DIAS, MODOS_FECHAS
+from financiero import CENTAVOS, REDONDEO, Abono
+from tabla import COLUMNAS, TablaAmortizacion
+from tabla_perezosa import TablaPerezosa
+
+CREDITOS = 150 # Créditos aleatorios por comprobación
+SEMILLA = 20251107
+PLAZO_MAXIMO_ANIOS = 40 # Con plazos mayores la cuota redondeada puede no cubrir el interés
+TIPOS_TASA = ('NOMINAL', 'EFECTIVA', 'ANTICIPADA')
+FRECUENCIAS = tuple(financiero.FRECUENCIAS_ANUALES.values())
+
+
+def generar_creditos(cantidad: int = CREDITOS, semilla: int = SEMILLA, centavos_exactos: bool = False) -> List[Dict]:
+    """Créditos aleatorios con tasa periódica y cuota ya calculadas.
+
+    Sin centavos_exactos, algunos principales tienen fracciones de centavo.
+    """
+    azar = random.Random(semilla)
+    creditos = []
+    for _ in range(cantidad):
+        decimales = 2 if centavos_exactos or azar.random() < 0.7 else 3
+        principal = round(azar.uniform(1e4, 5e8), decimales)
+        frecuencia = azar.choice(FRECUENCIAS)
+        n_periodos = min(azar.choice([1, 2, 3, 12, azar.randint(4, 120), azar.randint(121, 480)]),
+                         PLAZO_MAXIMO_ANIOS * frecuencia)
+        tasa_anual, tipo_tasa = azar.uniform(0.005, 0.40), azar.choice(TIPOS_TASA)
+        tasa_per = financiero.calcular_tasa_periodica(tasa_anual, frecuencia, tipo_tasa)
+        creditos.append({
+            'principal': principal,
+            'tasa_anual': tasa_anual,
+            'tipo_tasa': tipo_tasa,
+            'tasa_per': tasa_per,
+            'cuota': financiero.calcular_cuota_constante(principal, tasa_per, n_periodos),
+            'n_periodos': n_periodos,
+            'frecuencia': frecuencia,
+            'fecha_inicio': date.fromordinal(date(2020, 1, 1).toordinal() + azar.randrange(3650)),
+            'modo_fechas': azar.choice(MODOS_FECHAS),
+            'azar': random.Random(azar.random()), # Para elegir abonos y períodos de este crédito
+        })
+    return creditos
+
+
+def _tabla_base(credito: Dict, en_centavos: bool = False) -> TablaAmortizacion:
+    return financiero.generar_tabla_base(credito['principal'], credito['tasa_per'], credito['cuota'],
+                                         credito['n_periodos'], credito['frecuencia'], credito['fecha_inicio'],
+                                         en_centavos=en_centavos, modo_fechas=credito['modo_fechas'])
+
+
+def _describir(credito: Dict) -> str:
+    return (f"principal={credito['principal']} tasa_per={credito['tasa_per']!r} n={credito['n_periodos']} "
+            f"frecuencia={credito['frecuencia']} modo={credito['modo_fechas']}")
+
+
+def _primera_diferencia(esperada, obtenida, sin_marca: int = None) -> Optional[str]:
+    """Primera fila distinta entre dos tablas; desde la fila `sin_marca` se ignora 'recalculado'."""
+    if len(esperada) != len(obtenida):
+        return f"{len(obtenida)} filas en lugar de {len(esperada)}"
+    for idx, (fila_esperada, fila_obtenida) in enumerate(zip(esperada, obtenida)):
+        a, b = dict(fila_esperada), dict(fila_obtenida)
+        if sin_marca is not None and idx >= sin_marca:
+            a.pop('recalculado'), b.pop('recalculado')
+        if a != b:
+            columnas = [col for col in a if a[col] != b[col]]
+            return f"período {a['periodo']}: {columnas} {[a[c] for c in columnas]} != {[b[c] for c in columnas]}"
+    return None
+
+
+# --- Comprobaciones ---
+
+def verificar_cartera(creditos: List[Dict]) -> List[str]:
+    """generar_tablas_cartera contra generar_tabla_base, columna a columna."""
+    from cartera import COLUMNAS_CARTERA, generar_tablas_cartera
+    tablas = generar_tablas_cartera([c['principal'] for c in creditos], [c['tasa_per'] for c in creditos],
+                                    [c['cuota'] for c in creditos], [c['n_periodos'] for c in creditos])
+    fallas = []
+    for fila, credito in enumerate(creditos):
+        referencia = _tabla_base(credito)
+        n = credito['n_periodos']
+        for columna in COLUMNAS_CARTERA:
+            if list(referencia.columna(columna)) != tablas[columna][fila, :n].tolist():
+                fallas.append(f"cartera: columna {columna} distinta ({_describir(credito)})")
+                break
+    return fallas
+
+
+def verificar_perezosa(creditos: List[Dict]) -> List[str]:
+    """TablaPerezosa contra generar_tabla_base en consultas puntuales y al materializarla."""
+    fallas = []
+    for credito in creditos:
+        referencia = _tabla_base(credito)
+        perezosa = TablaPerezosa(credito['principal'], credito['tasa_per'], credito['cuota'], credito['n_periodos'],
+                                 credito['frecuencia'], credito['fecha_inicio'], paso_control=16,
+                                 modo_fechas=credito['modo_fechas'])
+        diferencia = _primera_diferencia(referencia, perezosa.materializar())
+        if diferencia:
+            fallas.append(f"TablaPerezosa.materializar: {diferencia} ({_describir(credito)})")
+            continue
+        interes = referencia.columna('interes')
+        n = credito['n_periodos']
+        for k in sorted({0, 1, n, credito['azar'].randint(0, n), credito['azar'].randint(0, n)}):
+            saldo = credito['principal'] if k == 0 else referencia.columna('saldo_final')[k - 1]
+            acumulado = round(sum(interes[:k]), REDONDEO)
+            if perezosa.saldo_en(k) != saldo:
+                fallas.append(f"TablaPerezosa.saldo_en({k}): {perezosa.saldo_en(k)} != {saldo} ({_describir(credito)})")
+            # La suma en punto flotante de montos muy grandes puede variar en su último bit
+            if abs(perezosa.interes_acumulado(k) - acumulado) > max(1e-6, abs(acumulado) * 1e-15):
+                fallas.append(f"TablaPerezosa.interes_acumulado({k}): {perezosa.interes_acumulado(k)} != {acumulado} "
+                              f"({_describir(credito)})")
+            if k and dict(perezosa.fila(k)) != dict(referencia[k - 1]):
+                fallas.append(f"TablaPerezosa.fila({k}) distinta ({_describir(credito)})")
+    return fallas
+
+
+def _abonos_aleatorios(credito: Dict, tabla: TablaAmortizacion, opciones=('PLAZO', 'CUOTA'),
+                       cantidad: int = 1) -> List[Abono]:
+    """Abonos en períodos distintos y crecientes; a veces el último salda el crédito."""
+    azar = credito['azar']
+    n = credito['n_periodos']
+    if n < 3:
+        return []
+    periodos = sorted(azar.sample(range(1, n - 1), min(cantidad, n - 2)))
+    abonos = []
+    for posicion, periodo in enumerate(periodos):
+        saldo = tabla[periodo - 1]['saldo_final']
+        ultimo = posicion == len(periodos) - 1
+        fraccion = azar.choice([0.01, 0.2, 1.5]) if ultimo else azar.choice([0.01, 0.1])
+        abonos.append(Abono(periodo, round(saldo * fraccion, 2), azar.choice(opciones)))
+    return abonos
+
+
+def _abonos_credito(credito: Dict, tabla: TablaAmortizacion) -> List[Abono]:
+    """Un abono PLAZO o CUOTA, o varios CUOTA (con PLAZO, un abono posterior podría caer fuera del plazo)."""
+    if credito['azar'].random() < 0.4:
+        return _abonos_aleatorios(credito, tabla, ('CUOTA',), cantidad=3)
+    return _abonos_aleatorios(credito, tabla)
+
+
+def _referencia_encadenada(credito: Dict, abonos: List[Abono]) -> (List[Dict], Optional[int]):
+    """Tabla del motor original con los abonos encadenados, sin la fila que PLAZO deja duplicada.
+
+    Devuelve también el índice desde el que las filas quedan en cero (crédito saldado).
+    """
+    tabla = _tabla_base(credito)
+    saldado = None
+    for periodo, monto, opcion in abonos:
+        tabla = financiero.aplicar_abono_y_recalcular(tabla, periodo, monto, opcion, credito['tasa_per'],
+                                                      credito['n_periodos'], credito['frecuencia'])
+        if tabla[periodo - 1]['saldo_final'] <= financiero.CERO_FINANCIERO:
+            saldado = periodo
+        elif opcion == 'PLAZO' and periodo + 1 < len(tabla) and tabla[periodo]['periodo'] == tabla[periodo + 1]['periodo']:
+            tabla = TablaAmortizacion.desde_filas([fila for idx, fila in enumerate(tabla) if idx != periodo])
+    return tabla, saldado
+
+
+def verificar_abonos(creditos: List[Dict]) -> List[str]:
+    """aplicar_abonos_y_recalcular e iterar_abonos_y_recalcular contra el motor original encadenado.
+
+    Con varios abonos solo se usa CUOTA: en PLAZO el motor original vuelve a cuota_original
+    y el de un solo recorrido mantiene la cuota vigente (diferencia documentada).
+    """
+    fallas = []
+    for credito in creditos:
+        base = _tabla_base(credito)
+        abonos = _abonos_credito(credito, base)
+        if not abonos:
+            continue
+        referencia, saldado = _referencia_encadenada(credito, abonos)
+        argumentos = (abonos, credito['tasa_per'], credito['n_periodos'], credito['frecuencia'])
+        for nombre, tabla in (('aplicar_abonos_y_recalcular', financiero.aplicar_abonos_y_recalcular(base, *argumentos)),
+                              ('iterar_abonos_y_recalcular', list(financiero.iterar_abonos_y_recalcular(base, *argumentos)))):
+            diferencia = _primera_diferencia(referencia, tabla, sin_marca=saldado)
+            if diferencia:
+                fallas.append(f"{nombre} {abonos}: {diferencia} ({_describir(credito)})")
+    return fallas
+
+
+def _empate_medio_centavo(saldo: float, tasa_per: float) -> bool:
+    """True si saldo * tasa cae (casi) en medio centavo, donde los dos modos pueden redondear distinto."""
+    centavos = saldo * tasa_per * CENTAVOS
+    return abs(centavos - int(centavos) - 0.5) < 1e-6
+
+
+def verificar_centavos(creditos: List[Dict]) -> List[str]:
+    """en_centavos=True contra el modo por defecto, con y sin abonos (principales al centavo)."""
+    fallas = []
+    for credito in creditos:
+        flotante, centavos = _tabla_base(credito), _tabla_base(credito, en_centavos=True)
+        abonos = _abonos_credito(credito, flotante)
+        if abonos:
+            argumentos = (abonos, credito['tasa_per'], credito['n_periodos'], credito['frecuencia'])
+            flotante = financiero.aplicar_abonos_y_recalcular(flotante, *argumentos)
+            centavos = financiero.aplicar_abonos_y_recalcular(centavos, *argumentos, en_centavos=True)
+        for idx, (a, b) in enumerate(zip(flotante, centavos)):
+            if dict(a) != dict(b):
+                if not _empate_medio_centavo(a['saldo_inicial'], credito['tasa_per']):
+                    fallas.append(f"en_centavos {abonos}: período {a['periodo']} distinto sin empate "
+                                  f"({_describir(credito)})")
+                break
+        else:
+            if len(flotante) != len(centavos):
+                fallas.append(f"en_centavos {abonos}: {len(centavos)} filas en lugar de {len(flotante)} "
+                              f"({_describir(credito)})")
+    return fallas
+
+
+def verificar_escenarios(cantidad: int = CREDITOS, semilla: int = SEMILLA) -> List[str]:
+    """Celdas de barrer_escenarios contra el motor (abono tope al saldo, como el barrido)."""
+    import numpy as np
+    from escenarios import TIPOS_TASA as TIPOS_ESCENARIO, TOLERANCIA_RELATIVA, barrer_escenarios
+    azar = random.Random(semilla)
+    monto, frecuencia, periodo_abono = 100000000.0, 12, 12
+    tasas = np.linspace(0.01, 0.60, 12)
+    plazos = [13, 24, 60, 120, 240, 360, 480]
+    montos_abono = [0.0, 1000000.0, 20000000.0, 200000000.0]
+    fallas = []
+    for opcion in ('PLAZO', 'CUOTA'):
+        grilla = barrer_escenarios(tasas, plazos, TIPOS_ESCENARIO, montos_abono, monto, frecuencia, periodo_abono, opcion)
+        for _ in range(cantidad // 2):
+            celda = grilla[tuple(azar.randrange(s) for s in grilla.shape)]
+            tasa_per, n = float(celda['tasa_per']), int(celda['plazo'])
+            tabla = financiero.generar_tabla_base(monto, tasa_per, float(celda['cuota']), n, frecuencia, date(2025, 1, 1))
+            abono = min(float(celda['monto_abono']), tabla[periodo_abono - 1]['saldo_final'])
+            if abono > 0:
+                tabla = financiero.aplicar_abonos_y_recalcular(tabla, [Abono(periodo_abono, abono, opcion)], tasa_per, n, frecuencia)
+            cuotas = tabla.columna('cuota_pagada')
+            interes = round(sum(cuotas) + sum(tabla.columna('abono_adhoc')), REDONDEO) - monto
+            plazo_final = sum(1 for cuota in cuotas if cuota > 0)
+            descripcion = f"{opcion} tasa={celda['tasa_anual']:.4f} plazo={n} {celda['tipo_tasa']} abono={celda['monto_abono']}"
+            if abs(interes - celda['interes_total']) > TOLERANCIA_RELATIVA * abs(interes) + 0.01:
+                fallas.append(f"escenarios: interés {celda['interes_total']} != {interes:.2f} ({descripcion})")
+            if plazo_final != celda['plazo_final']:
+                fallas.append(f"escenarios: plazo_final {celda['plazo_final']} != {plazo_final} ({descripcion})")
+            if abono > 0 and plazo_final > periodo_abono + 1 and cuotas[periodo_abono] != celda['cuota_final']:
+                fallas.append(f"escenarios: cuota_final {celda['cuota_final']} != {cuotas[periodo_abono]} ({descripcion})")
+    return fallas
+
+
+def verificar_objetivos(creditos: List[Dict]) -> List[str]:
+    """objetivos contra el motor: cada resultado reproduce la cuota pedida y es el mínimo posible."""
+    from objetivos import abono_para_cuota, plazo_para_cuota, tasa_anual_para_cuota
+    fallas = []
+    for credito in creditos:
+        principal, tasa_per, cuota, n = credito['principal'], credito['tasa_per'], credito['cuota'], credito['n_periodos']
+        descripcion = _describir(credito)
+
+        # Tasa -> cuota -> tasa: la tasa hallada vuelve a dar la misma cuota al centavo
+        tasa_anual = float(tasa_anual_para_cuota(principal, cuota, n, credito['frecuencia'], credito['tipo_tasa'])[0])
+        tasa_hallada = financiero.calcular_tasa_periodica(tasa_anual, credito['frecuencia'], credito['tipo_tasa'])
+        if financiero.calcular_cuota_constante(principal, tasa_hallada, n) != cuota:
+            fallas.append(f"objetivos.tasa_anual_para_cuota: {tasa_anual!r} no reproduce la cuota {cuota} ({descripcion})")
+
+        # Plazo: el hallado no excede la cuota y uno menos sí
+        plazo = int(plazo_para_cuota(principal, tasa_per, cuota)[0])
+        if not 1 <= plazo <= n or financiero.calcular_cuota_constante(principal, tasa_per, plazo) > cuota or \
+                (plazo > 1 and financiero.calcular_cuota_constante(principal, tasa_per, plazo - 1) <= cuota):
+            fallas.append(f"objetivos.plazo_para_cuota: {plazo} no es el menor plazo con cuota <= {cuota} ({descripcion})")
+
+        # Abono: con el hallado la cuota recalculada (CUOTA) no supera la objetivo; con un centavo menos, sí
+        if n < 2:
+            continue
+        periodo = credito['azar'].randint(1, n - 1)
+        saldo = _tabla_base(credito)[periodo - 1]['saldo_final']
+        objetivo = round(cuota * credito['azar'].uniform(0.05, 0.99), REDONDEO)
+        abono = float(abono_para_cuota(saldo, tasa_per, n - periodo, objetivo)[0])
+
+        def cuota_nueva(monto):
+            return financiero.calcular_cuota_constante(round(saldo - monto, REDONDEO), tasa_per, n - periodo)
+        if not 0 <= abono <= saldo or (abono < saldo and cuota_nueva(abono) > objetivo) or \
+                (abono > 0 and cuota_nueva(round(abono - 1 / CENTAVOS, REDONDEO)) <= objetivo):
+            fallas.append(f"objetivos.abono_para_cuota: {abono} no es el abono mínimo en el período {periodo} "
+                          f"para la cuota {objetivo} ({descripcion})")
+    return fallas
+
+
+def _fecha_esperada(inicio: date, frecuencia: int, k: int, modo: str) -> date:
+    """Fecha del pago k (desde 0) según la regla del modo, calculada aparte de calendario.py."""
+    if modo == MODO_DIAS or frecuencia not in MESES_POR_PERIODO and frecuencia != 24:
+        salto = 7 if modo != MODO_DIAS and frecuencia == 52 else calendario.salto_dias(frecuencia)
+        return date.fromordinal(inicio.toordinal() + k * salto)
+    if frecuencia == 24:
+        # Quincenas: día d del mes y d + 15 (o d - 15 del mes siguiente)
+        meses, dia = k // 2, inicio.day
+        if k % 2:
+            meses, dia = (meses, dia + 15) if dia <= 15 else (meses + 1, dia - 15)
+    else:
+        meses, dia = k * MESES_POR_PERIODO[frecuencia], inicio.day
+    anio, mes0 = divmod(inicio.year * 12 + inicio.month - 1 + meses, 12)
+    return date(anio, mes0 + 1, min(dia, monthrange(anio, mes0 + 1)[1]))
+
+
+def verificar_calendario(creditos: List[Dict]) -> List[str]:
+    """Fechas de generar_tabla_base, fechas_pago y fecha_periodo contra la regla de cada modo."""
+    fallas = []
+    for credito in creditos:
+        inicio, frecuencia, n = credito['fecha_inicio'], credito['frecuencia'], credito['n_periodos']
+        for modo in MODOS_FECHAS:
+            esperadas = [_fecha_esperada(inicio, frecuencia, k, modo).isoformat() for k in range(n)]
+            tabla = financiero.generar_tabla_base(credito['principal'], credito['tasa_per'], credito['cuota'], n,
+                                                  frecuencia, inicio, modo_fechas=modo)
+            secuencia = [calendario.formatear(o) for o in calendario.fechas_pago(inicio, frecuencia, n, modo)]
+            periodo = credito['azar'].randint(1, n)
+            puntual = calendario.formatear(calendario.fecha_periodo(inicio, frecuencia, periodo, modo))
+            if [fila['fecha'] for fila in tabla] != esperadas or secuencia != esperadas or puntual != esperadas[periodo - 1]:
+                fallas.append(f"calendario: fechas distintas en modo {modo} desde {inicio} ({_describir(credito)})")
+    return fallas
+
+
+def verificar_exportacion(creditos: List[Dict]) -> List[str]:
+    """Tablas (con y sin abonos) y carteras exportadas a .npy y leídas de vuelta."""
+    import numpy as np
+    from cartera import generar_tablas_cartera
+    from exportacion import exportar_cartera_npy, exportar_tabla_npy, leer_npy
+    fallas = []
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo = os.path.join(directorio, 'tabla.npy')
+        for credito in creditos:
+            tabla = _tabla_base(credito)
+            abonos = _abonos_credito(credito, tabla)
+            if abonos:
+                tabla = financiero.aplicar_abonos_y_recalcular(tabla, abonos, credito['tasa_per'],
+                                                               credito['n_periodos'], credito['frecuencia'])
+            exportar_tabla_npy(tabla, archivo)
+            leida = leer_npy(archivo)
+            distintas = [col for col in COLUMNAS if leida[col].tolist() != [
+                bool(v) if col == 'recalculado' else v for v in tabla.columna(col)]]
+            del leida # Liberar el mapeo antes de sobrescribir el archivo
+            if distintas:
+                fallas.append(f"exportacion.leer_npy: columnas {distintas} distintas ({_describir(credito)})")
+
+        archivo = os.path.join(directorio, 'cartera.npy')
+        tablas = generar_tablas_cartera([c['principal'] for c in creditos], [c['tasa_per'] for c in creditos],
+                                        [c['cuota'] for c in creditos], [c['n_periodos'] for c in creditos])
+        exportar_cartera_npy(tablas, archivo)
+        leida = leer_npy(archivo)
+        distintas = [col for col in leida.dtype.names if not np.array_equal(leida[col], tablas[col])]
+        del leida
+        if distintas:
+            fallas.append(f"exportacion.exportar_cartera_npy: columnas {distintas} distintas")
+    return fallas
+
+
+def verificar_almacen(creditos: List[Dict]) -> List[str]:
+    """Tabla guardada tras cada aplicar_abono (reescritura parcial) contra lote.calcular_prestamo."""
+    from almacen import PARCIAL, AlmacenTablas
+    from lote import calcular_prestamo
+    fallas = []
+    with AlmacenTablas() as almacen:
+        for numero, credito in enumerate(creditos, start=1):
+            prestamo = {
+                'id': str(numero), 'monto': credito['principal'], 'tasa': credito['tasa_anual'],
+                'plazo': credito['n_periodos'], 'frecuencia': credito['frecuencia'], 'tipo_tasa': credito['tipo_tasa'],
+                'fecha_inicio': credito['fecha_inicio'].isoformat(), 'calendario': credito['modo_fechas'], 'abonos': [],
+            }
+            almacen.guardar(prestamo)
+            for abono in _abonos_credito(credito, _tabla_base(credito)):
+                estado = almacen.aplicar_abono(prestamo['id'], abono)
+                prestamo['abonos'].append(abono)
+                diferencia = _primera_diferencia(calcular_prestamo(prestamo), almacen.tabla(prestamo['id']))
+                if estado != PARCIAL or diferencia:
+                    fallas.append(f"almacen.aplicar_abono {prestamo['abonos']}: {estado} {diferencia or ''} "
+                                  f"({_describir(credito)})")
+                    break
+    return fallas
+
+
+def verificar_equivalencias(cantidad: int = CREDITOS, semilla: int = SEMILLA) -> Dict[str, List[str]]:
+    """Ejecuta todas las comprobaciones; devuelve las fallas de cada una (None si se omitió)."""
+    creditos = generar_creditos(cantidad, semilla)
+    al_centavo = generar_creditos(cantidad, semilla + 1, centavos_exactos=True)
+    comprobaciones = {
+        'cartera': lambda: verificar_cartera(creditos),
+        'tabla_perezosa': lambda: verificar_perezosa(creditos),
+        'abonos': lambda: verificar_abonos(creditos),
+        'en_centavos': lambda: verificar_centavos(al_centavo),
+        'escenarios': lambda: verificar_escenarios(cantidad, semilla),
+        'objetivos': lambda: verificar_objetivos(al_centavo),
+        'calendario': lambda: verificar_calendario(creditos),
+        'exportacion': lambda: verificar_exportacion(creditos),
+        'almacen': lambda: verificar_almacen(creditos),
+    }
+    resultados = {}
+    for nombre, comprobar in comprobaciones.items():
+        try:
+            resultados[nombre] = comprobar()
+        except ImportError: # cartera, escenarios, objetivos y exportacion requieren numpy
+            resultados[nombre] = None
+    return resultados
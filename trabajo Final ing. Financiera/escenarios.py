@@ -0,0 +1,225 @@
+import numpy as np
+from typing import Sequence
+
+from cartera import generar_tablas_cartera
+from financiero import CERO_FINANCIERO
+from vectorial import cuota_constante, redondear
+
+TIPOS_TASA = ('EFECTIVA', 'NOMINAL', 'ANTICIPADA')
+
+# Error relativo máximo admitido en el interés total de las formas cerradas; las celdas cuya
+# cota de error lo supera se calculan fila a fila con cartera.generar_tablas_cartera.
+TOLERANCIA_RELATIVA = 1e-6
+ERROR_POR_FILA = 0.01 # Cota del desvío que agrega cada fila (redondeo del interés y del saldo)
+TAMANO_BLOQUE_EXACTO = 2048 # Celdas por llamada a generar_tablas_cartera en el cálculo exacto
+
+# Resultado de cada celda de la grilla; arreglo estructurado listo para graficar
+DTYPE_ESCENARIO = np.dtype([
+    ('tasa_anual', '<f8'),
+    ('plazo', '<i4'),
+    ('tipo_tasa', 'U10'),
+    ('monto_abono', '<f8'),
+    ('tasa_per', '<f8'),
+    ('cuota', '<f8'),
+    ('cuota_final', '<f8'),   # Cuota vigente después del abono
+    ('interes_total', '<f8'),
+    ('total_pagado', '<f8'),  # Cuotas pagadas más abonos
+    ('plazo_final', '<i4'),
+])
+
+
+def tasas_periodicas(tasas_anuales, frecuencia_pago: int, tipo_tasa: str) -> np.ndarray:
+    """Equivalente vectorizado de financiero.calcular_tasa_periodica."""
+    tasas_anuales = np.asarray(tasas_anuales, dtype=float)
+    tipo_tasa = tipo_tasa.upper()
+    if tipo_tasa == 'EFECTIVA':
+        return (1 + tasas_anuales) ** (1 / frecuencia_pago) - 1
+    if tipo_tasa == 'NOMINAL':
+        return tasas_anuales / frecuencia_pago
+    if tipo_tasa == 'ANTICIPADA':
+        tasa_anticipada_per = tasas_anuales / frecuencia_pago
+        if np.any(tasa_anticipada_per >= 1.0):
+            raise ValueError("Tasa anticipada excesivamente alta (>100%). No es aplicable.")
+        return tasa_anticipada_per / (1 - tasa_anticipada_per)
+    raise ValueError("Tipo de tasa no reconocido. Use: EFECTIVA, NOMINAL o ANTICIPADA.")
+
+
+def _saldo(principal, tasa_per, cuota, k):
+    """Saldo después de k cuotas constantes (forma cerrada, sin redondeo por fila)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factor = (1 + tasa_per) ** k
+        return np.where(tasa_per == 0, principal - cuota * k,
+                        principal * factor - cuota * (factor - 1) / tasa_per)
+
+
+def _saldo_filas(principal: float, tasa_per, cuota, k: int):
+    """Saldo al cierre de k filas de la tabla base, redondeando cada fila como el motor."""
+    saldo = np.full(tasa_per.shape, float(principal))
+    for _ in range(k):
+        interes = redondear(saldo * tasa_per)
+        saldo = redondear(saldo - redondear(cuota - interes))
+        saldo = np.where(saldo < CERO_FINANCIERO, 0.0, saldo)
+    return saldo
+
+
+def _pagos_hasta_cancelar(saldo, tasa_per, cuota):
+    """Cuotas necesarias para cancelar `saldo` pagando `cuota` (la última ajustada) y su total."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = np.where(tasa_per == 0, saldo / cuota,
+                     -np.log1p(-saldo * tasa_per / cuota) / np.log1p(tasa_per))
+    n = np.maximum(np.ceil(x - 1e-9), 1)
+    ultima = _saldo(saldo, tasa_per, cuota, n - 1) * (1 + tasa_per)
+    return n, cuota * (n - 1) + ultima
+
+
+def _cota_desvio(saldo_inicial_cota, tasa_per, k):
+    """Cota del desvío entre el saldo de las filas y el de la forma cerrada tras k filas.
+
+    Cada fila redondea su interés y su saldo (a lo sumo ERROR_POR_FILA) y el desvío
+    acumulado se capitaliza con la tasa; `saldo_inicial_cota` es el desvío de partida.
+    """
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        factor = (1 + tasa_per) ** k
+        return saldo_inicial_cota * factor + ERROR_POR_FILA * np.where(tasa_per == 0, k, (factor - 1) / tasa_per)
+
+
+def _plazo_ambiguo(saldo, tasa_per, cuota, n, cota):
+    """True donde el desvío posible podría mover la fila de cierre de la n-ésima cuota.
+
+    La fila n cierra si saldo + interés < cuota; la n - 1 no debe cerrar.
+    """
+    with np.errstate(over='ignore', invalid='ignore'):
+        margen_ultima = cuota - _saldo(saldo, tasa_per, cuota, n - 1) * (1 + tasa_per)
+        margen_previa = np.where(n >= 2, _saldo(saldo, tasa_per, cuota, n - 2) * (1 + tasa_per) - cuota, np.inf)
+        holgura = cota * (1 + tasa_per) + ERROR_POR_FILA
+        return ~((margen_ultima > holgura) & (margen_previa > holgura))
+
+
+def _periodos_pagados(tablas) -> np.ndarray:
+    """Períodos con cuota pagada de cada préstamo de generar_tablas_cartera (como lote._resumir)."""
+    return (tablas['cuota_pagada'] > 0).sum(axis=1)
+
+
+def _calcular_exacto(monto: float, tasa_per, n, abonos, cuota, periodo_abono: int, opcion: str):
+    """Total pagado, plazo final y cuota final fila a fila (mismas reglas que el motor)."""
+    base = generar_tablas_cartera(monto, tasa_per, cuota, n)
+    total = base['cuota_pagada'].sum(axis=1)
+    plazo_final = _periodos_pagados(base)
+    cuota_final = cuota.copy()
+    activo = abonos > 0
+    if not activo.any():
+        return total, plazo_final, cuota_final
+
+    k = periodo_abono
+    saldo_k = base['saldo_final'][:, k - 1]
+    abono = np.where(activo, np.minimum(abonos, saldo_k), 0.0)
+    restante = redondear(saldo_k - abono)
+    saldado = activo & (restante <= CERO_FINANCIERO)
+    sigue = activo & ~saldado
+    pagado_k = base['cuota_pagada'][:, :k].sum(axis=1) + abono
+    if opcion == 'PLAZO':
+        # El motor deja de recalcular 100 períodos después del plazo original
+        resto = generar_tablas_cartera(np.where(sigue, restante, 0.0), tasa_per, cuota, n - k + 100)
+    else:
+        cuota_final = np.where(sigue, cuota_constante(restante, tasa_per, n - k), cuota)
+        resto = generar_tablas_cartera(np.where(sigue, restante, 0.0), tasa_per, cuota_final, n - k,
+                                       cierre_anticipado=False)
+    total = np.where(saldado, pagado_k, np.where(sigue, pagado_k + resto['cuota_pagada'].sum(axis=1), total))
+    plazo_final = np.where(saldado, k, np.where(sigue, k + _periodos_pagados(resto), plazo_final))
+    return total, plazo_final, cuota_final
+
+
+def barrer_escenarios(tasas_anuales: Sequence[float], plazos: Sequence[int], tipos_tasa: Sequence[str] = TIPOS_TASA,
+                      montos_abono: Sequence[float] = (0.0,), monto: float = 100000000.0, frecuencia_pago: int = 12,
+                      periodo_abono: int = 12, opcion_recalculo: str = 'PLAZO') -> np.ndarray:
+    """Métricas agregadas de cada combinación tasa x plazo x tipo de tasa x monto de abono.
+
+    Usa las sumas cerradas de la anualidad con la cuota redondeada de
+    calcular_cuota_constante, que omiten el redondeo del interés de cada fila. Ese desvío se
+    capitaliza con la tasa, así que crece rápido con tasas altas y plazos largos: para cada
+    celda se acota y, si la cota supera TOLERANCIA_RELATIVA del interés total o podría
+    cambiar el plazo final, el saldado o la cuota recalculada, la celda se calcula fila a
+    fila con cartera.generar_tablas_cartera. El interés total queda así dentro de
+    TOLERANCIA_RELATIVA del que da el motor, y plazo_final y cuota_final coinciden.
+    El abono se aplica al cierre de `periodo_abono` con la opción PLAZO o CUOTA; si cubre
+    el saldo, se toma solo el saldo y el crédito termina en ese período.
+    Devuelve un arreglo estructurado DTYPE_ESCENARIO de forma
+    (len(tasas_anuales), len(plazos), len(tipos_tasa), len(montos_abono)).
+    """
+    opcion = opcion_recalculo.upper()
+    if opcion not in ('PLAZO', 'CUOTA'):
+        raise ValueError("Opción de re-cálculo no válida. Use: PLAZO o CUOTA.")
+    tasas = np.asarray(tasas_anuales, dtype=float)[:, None, None, None]
+    n = np.asarray(plazos, dtype=np.int64)[None, :, None, None]
+    abonos = np.asarray(montos_abono, dtype=float)[None, None, None, :]
+    hay_abono = np.any(abonos > 0)
+    if hay_abono and (periodo_abono <= 0 or periodo_abono >= n.min()):
+        raise IndexError("El período de abono debe ser anterior al menor de los plazos.")
+
+    tasa_per = np.stack([tasas_periodicas(tasas, frecuencia_pago, tipo)[..., 0, 0] for tipo in tipos_tasa], axis=-1)[..., None]
+    forma = np.broadcast_shapes(tasa_per.shape, n.shape, abonos.shape)
+    tasa_per, n, abonos = (np.broadcast_to(a, forma) for a in (tasa_per, n, abonos))
+    cuota = cuota_constante(np.full(forma, float(monto)), tasa_per, n)
+
+    # Sin abono: n - 1 cuotas constantes más la última, ajustada para cerrar el saldo
+    total_sin_abono = cuota * (n - 1) + _saldo(monto, tasa_per, cuota, n - 1) * (1 + tasa_per)
+    cota_sin_abono = _cota_desvio(0.0, tasa_per, n)
+    resultado = np.empty(forma, dtype=DTYPE_ESCENARIO)
+    resultado['cuota_final'] = cuota
+    resultado['total_pagado'] = total_sin_abono
+    resultado['plazo_final'] = n
+    cota = cota_sin_abono
+    # La tabla base cierra en la fila n; solo podría terminar antes si el saldo previo se anulara
+    with np.errstate(over='ignore', invalid='ignore'):
+        ambiguo = ~(_saldo(monto, tasa_per, cuota, n - 1) > _cota_desvio(0.0, tasa_per, n - 1))
+
+    if hay_abono:
+        k = periodo_abono
+        # El saldo al abono se obtiene fila a fila (son pocas): así el saldado y la cuota
+        # recalculada salen exactos, y solo el tramo posterior usa formas cerradas
+        saldo_k = _saldo_filas(monto, tasa_per, cuota, k)
+        abono = np.minimum(abonos, saldo_k)
+        restante = redondear(saldo_k - abono) # El motor guarda los saldos al centavo
+        activo = abonos > 0
+        saldado = activo & (restante <= CERO_FINANCIERO)
+        pagado_k = cuota * k + abono
+
+        if opcion == 'PLAZO':
+            n_resto, total_resto = _pagos_hasta_cancelar(restante, tasa_per, cuota)
+            cuota_final = cuota
+            ambiguo_resto = _plazo_ambiguo(restante, tasa_per, cuota, n_resto, _cota_desvio(0.0, tasa_per, n_resto - 1))
+        else:
+            # El régimen CUOTA cierra siempre en el plazo original
+            n_resto = n - k
+            cuota_final = cuota_constante(restante, tasa_per, n_resto)
+            total_resto = cuota_final * (n_resto - 1) + _saldo(restante, tasa_per, cuota_final, n_resto - 1) * (1 + tasa_per)
+            ambiguo_resto = np.zeros(forma, dtype=bool)
+
+        resultado['total_pagado'] = np.where(saldado, pagado_k, np.where(activo, pagado_k + total_resto, total_sin_abono))
+        resultado['plazo_final'] = np.where(saldado, k, np.where(activo, k + n_resto, n))
+        resultado['cuota_final'] = np.where(activo & ~saldado, cuota_final, resultado['cuota_final'])
+        cota = np.where(saldado, 0.0, np.where(activo, _cota_desvio(0.0, tasa_per, n_resto), cota_sin_abono))
+        # Tabla base cerrada antes del abono (tasas extremas) o plazo posterior incierto
+        ambiguo = np.where(activo, ambiguo | (saldo_k <= CERO_FINANCIERO) | (~saldado & ambiguo_resto), ambiguo)
+
+    # Celdas fuera del dominio de las formas cerradas: cálculo fila a fila
+    interes_aprox = resultado['total_pagado'] - monto
+    with np.errstate(invalid='ignore'):
+        exactas = np.flatnonzero(ambiguo | ~(cota <= TOLERANCIA_RELATIVA * np.abs(interes_aprox)))
+    for inicio in range(0, exactas.size, TAMANO_BLOQUE_EXACTO):
+        celdas = np.unravel_index(exactas[inicio:inicio + TAMANO_BLOQUE_EXACTO], forma)
+        total, plazo_final, cuota_final = _calcular_exacto(float(monto), tasa_per[celdas], n[celdas], abonos[celdas],
+                                                           cuota[celdas], periodo_abono, opcion)
+        resultado['total_pagado'][celdas] = total
+        resultado['plazo_final'][celdas] = plazo_final
+        resultado['cuota_final'][celdas] = cuota_final
+
+    resultado['total_pagado'] = redondear(resultado['total_pagado'])
+    resultado['interes_total'] = redondear(resultado['total_pagado'] - monto)
+    resultado['tasa_anual'] = np.broadcast_to(tasas, forma)
+    resultado['plazo'] = np.broadcast_to(np.asarray(plazos)[None, :, None, None], forma)
+    resultado['tipo_tasa'] = np.broadcast_to(np.asarray(tipos_tasa, dtype='U10')[None, None, :, None], forma)
+    resultado['monto_abono'] = abonos
+    resultado['tasa_per'] = tasa_per
+    resultado['cuota'] = cuota
+    return resultado
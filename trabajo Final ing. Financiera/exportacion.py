@@ -0,0 +1,126 @@
+import numpy as np
+from datetime import date
+from typing import Dict, Iterable
+
+from numpy.lib.format import open_memmap
+
+from cartera import COLUMNAS_CARTERA
+from tabla import COLUMNAS, TablaAmortizacion
+
+# Registro binario de ancho fijo (little-endian) de una fila de la tabla; 65 bytes por fila
+DTYPE_TABLA = np.dtype([
+    ('periodo', '<i4'),
+    ('fecha', '<i4'), # Ordinal de la fecha (date.toordinal)
+    ('saldo_inicial', '<f8'),
+    ('interes', '<f8'),
+    ('cuota_original', '<f8'),
+    ('cuota_pagada', '<f8'),
+    ('amortizacion', '<f8'),
+    ('abono_adhoc', '<f8'),
+    ('saldo_final', '<f8'),
+    ('recalculado', '?'),
+])
+
+# Celda de una cartera (préstamos x períodos) generada por cartera.generar_tablas_cartera
+DTYPE_CARTERA = np.dtype([(col, '<f8') for col in COLUMNAS_CARTERA] + [('activo', '?')])
+
+# Diferencia entre el ordinal de Python y los días desde 1970-01-01 (datetime64[D])
+_ORDINAL_EPOCA = date(1970, 1, 1).toordinal()
+
+
+def _como_tabla(tabla: Iterable[Dict]) -> TablaAmortizacion:
+    if isinstance(tabla, TablaAmortizacion):
+        return tabla
+    return TablaAmortizacion.desde_filas(tabla)
+
+
+def ordinales_a_datetime64(ordinales: np.ndarray) -> np.ndarray:
+    """Convierte la columna 'fecha' (ordinales) a datetime64[D]."""
+    return (np.asarray(ordinales, dtype=np.int64) - _ORDINAL_EPOCA).astype('datetime64[D]')
+
+
+def exportar_tabla_npy(tabla: Iterable[Dict], nombre_archivo: str = "tabla_amortizacion.npy"):
+    """Exporta la tabla como arreglo estructurado .npy (DTYPE_TABLA), legible con memoria mapeada.
+
+    Las columnas de una TablaAmortizacion se copian directamente de sus arreglos tipados,
+    sin pasar por texto ni por diccionarios.
+    """
+    tabla = _como_tabla(tabla)
+    destino = open_memmap(nombre_archivo, mode='w+', dtype=DTYPE_TABLA, shape=(len(tabla),))
+    for col in COLUMNAS:
+        origen = tabla.columna(col)
+        if len(origen):
+            destino[col] = np.frombuffer(origen, dtype=origen.typecode)
+    destino.flush()
+    del destino
+    return f"Tabla exportada a {nombre_archivo}"
+
+
+def exportar_cartera_npy(tablas: Dict[str, np.ndarray], nombre_archivo: str = "cartera.npy"):
+    """Exporta el resultado de generar_tablas_cartera como arreglo estructurado 2-D .npy."""
+    forma = tablas['activo'].shape
+    destino = open_memmap(nombre_archivo, mode='w+', dtype=DTYPE_CARTERA, shape=forma)
+    for col in DTYPE_CARTERA.names:
+        destino[col] = tablas[col]
+    destino.flush()
+    del destino
+    return f"Cartera exportada a {nombre_archivo}"
+
+
+def leer_npy(nombre_archivo: str) -> np.ndarray:
+    """Abre un .npy exportado con memoria mapeada (solo lectura); no lo carga completo."""
+    return np.load(nombre_archivo, mmap_mode='r')
+
+
+# --- Formatos Arrow/Parquet (opcionales, requieren pyarrow) ---
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        raise ImportError("Esta exportación requiere la librería pyarrow (pip install pyarrow).")
+
+
+def _tabla_arrow(tabla: Iterable[Dict]):
+    pa = _pyarrow()
+    tabla = _como_tabla(tabla)
+    columnas = {}
+    for col in COLUMNAS:
+        origen = tabla.columna(col)
+        valores = np.frombuffer(origen, dtype=origen.typecode) if len(origen) else np.array([], dtype=origen.typecode)
+        if col == 'fecha':
+            valores = ordinales_a_datetime64(valores)
+        elif col == 'recalculado':
+            valores = valores.astype(bool)
+        columnas[col] = pa.array(valores)
+    return pa.table(columnas)
+
+
+def exportar_tabla_parquet(tabla: Iterable[Dict], nombre_archivo: str = "tabla_amortizacion.parquet"):
+    """Exporta la tabla a Parquet (fecha como date32)."""
+    pa = _pyarrow()
+    pa.parquet.write_table(_tabla_arrow(tabla), nombre_archivo)
+    return f"Tabla exportada a {nombre_archivo}"
+
+
+def exportar_tabla_arrow(tabla: Iterable[Dict], nombre_archivo: str = "tabla_amortizacion.arrow"):
+    """Exporta la tabla en formato Arrow IPC, que se puede leer con memoria mapeada."""
+    pa = _pyarrow()
+    tabla_arrow = _tabla_arrow(tabla)
+    with pa.OSFile(nombre_archivo, 'wb') as destino, pa.ipc.new_file(destino, tabla_arrow.schema) as escritor:
+        escritor.write_table(tabla_arrow)
+    return f"Tabla exportada a {nombre_archivo}"
+
+
+def leer_tabla_arrow(nombre_archivo: str):
+    """Lee un archivo Arrow IPC con memoria mapeada (sin copiar los datos)."""
+    pa = _pyarrow()
+    return pa.ipc.open_file(pa.memory_map(nombre_archivo, 'r')).read_all()
+
+
+def leer_tabla_parquet(nombre_archivo: str):
+    """Lee un archivo Parquet usando memoria mapeada."""
+    pa = _pyarrow()
+    return pa.parquet.read_table(nombre_archivo, memory_map=True)
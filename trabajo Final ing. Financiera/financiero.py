@@ -1,14 +1,45 @@
-import math
-from datetime import date, timedelta
-from typing import List, Dict
+from datetime import date
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, NamedTuple, Sequence
+
+import calendario
+from calendario import MODO_DIAS
+from instrumentacion import FILAS_ARGUMENTO, FILAS_ITERADAS, FILAS_RESULTADO, instrumentar
+from tabla import COLUMNAS, TablaAmortizacion, _a_ordinal
 
 # La precisión de cierre para evitar saldos residuales.
 CERO_FINANCIERO = 0.000001
 REDONDEO = 2
+CENTAVOS = 10 ** REDONDEO # Unidades mínimas por unidad monetaria en el modo en centavos
 DIAS_PERIODO = 30 # Asumido para cálculo de fechas en la interfaz (aproximado)
+TAMANO_CACHE = 4096 # Máximo de combinaciones memorizadas por cada caché de factores
+
+# --- Diccionario de Frecuencias Estándar ---
+FRECUENCIAS_ANUALES = {
+    "Mensual (12)": 12,
+    "Quincenal (24)": 24,
+    "Bimestral (6)": 6,
+    "Trimestral (4)": 4,
+    "Semestral (2)": 2,
+    "Anual (1)": 1,
+    "Semanal (52)": 52,
+}
+# ---------------------------------------------
+
+class Abono(NamedTuple):
+    """Abono extraordinario: período, monto y opción de re-cálculo (PLAZO o CUOTA)."""
+    periodo: int
+    monto: float
+    opcion: str
 
+@instrumentar()
 def calcular_tasa_periodica(tasa_anual: float, frecuencia_pago: int, tipo_tasa: str) -> float:
     """Convierte la tasa anual (ya en factor decimal) a la Tasa Efectiva Periódica (vencida)."""
+    return _tasa_periodica(tasa_anual, frecuencia_pago, tipo_tasa.upper())
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def _tasa_periodica(tasa_anual: float, frecuencia_pago: int, tipo_tasa: str) -> float:
+    """Conversión de tasa memorizada por (tasa_anual, frecuencia_pago, tipo_tasa)."""
     
     if tipo_tasa.upper() == 'EFECTIVA':
         # Tasa Efectiva Anual (TEA) a Periódica
@@ -27,25 +58,41 @@ def calcular_tasa_periodica(tasa_anual: float, frecuencia_pago: int, tipo_tasa:
     
     return i
 
+@instrumentar()
 def calcular_cuota_constante(principal: float, tasa_per: float, n_periodos: int) -> float:
     """Calcula la cuota constante (PMT) usando la fórmula de anualidad vencida."""
     if tasa_per == 0:
         return round(principal / n_periodos, REDONDEO)
     
-    factor = (1 + tasa_per) ** n_periodos
+    factor = factor_anualidad(tasa_per, n_periodos)
     cuota = principal * (tasa_per * factor) / (factor - 1)
     return round(cuota, REDONDEO)
 
-def generar_tabla_base(principal: float, tasa_per: float, cuota: float, n_periodos: int, frecuencia_pago: int, fecha_inicio: date) -> List[Dict]:
-    """Genera la tabla de amortización inicial."""
-    tabla = []
+@lru_cache(maxsize=TAMANO_CACHE)
+def factor_anualidad(tasa_per: float, n_periodos: int) -> float:
+    """Factor de capitalización (1 + i) ** n, memorizado por (tasa_per, n_periodos)."""
+    return (1 + tasa_per) ** n_periodos
+
+def estadisticas_cache() -> Dict[str, Dict]:
+    """Aciertos, fallos y tamaño de las cachés de tasas y factores de anualidad."""
+    return {
+        'tasa_periodica': _tasa_periodica.cache_info()._asdict(),
+        'factor_anualidad': factor_anualidad.cache_info()._asdict(),
+    }
+
+def limpiar_cache():
+    """Vacía las cachés de tasas y factores (útil en pruebas y mediciones)."""
+    _tasa_periodica.cache_clear()
+    factor_anualidad.cache_clear()
+
+def _filas_base(principal: float, tasa_per: float, cuota: float, n_periodos: int, frecuencia_pago: int, fecha_inicio: date, modo_fechas: str = MODO_DIAS) -> Iterator[tuple]:
+    """Genera los valores de cada fila de la tabla inicial (fecha como ordinal)."""
     saldo = principal
-    fecha_actual = fecha_inicio
 
-    # Calcular el salto en días basado en la frecuencia anual (aproximado)
-    salto_dias = round(365 / frecuencia_pago)
+    # Todas las fechas de pago de una vez (memorizadas por el calendario)
+    fechas = calendario.fechas_pago(fecha_inicio, frecuencia_pago, n_periodos, modo_fechas)
 
-    for periodo in range(1, n_periodos + 1):
+    for periodo, fecha_actual in zip(range(1, n_periodos + 1), fechas):
         interes = round(saldo * tasa_per, REDONDEO)
         
         # *** CORRECCIÓN CLAVE: Definir cuota_periodo antes de los condicionales ***
@@ -66,24 +113,81 @@ def generar_tabla_base(principal: float, tasa_per: float, cuota: float, n_period
             cuota_periodo = amortizacion + interes
             saldo_final = 0.0
             
-        tabla.append({
-            'periodo': periodo,
-            'fecha': fecha_actual.strftime("%Y-%m-%d"),
-            'saldo_inicial': round(saldo, REDONDEO),
-            'interes': interes,
-            'cuota_original': cuota,
-            'cuota_pagada': round(cuota_periodo, REDONDEO), # Variable siempre definida
-            'amortizacion': amortizacion,
-            'abono_adhoc': 0.0,
-            'saldo_final': saldo_final,
-            'recalculado': False
-        })
+        yield (
+            periodo,
+            fecha_actual, # Ordinal; se formatea como YYYY-MM-DD al leer la fila
+            round(saldo, REDONDEO),
+            interes,
+            cuota,
+            round(cuota_periodo, REDONDEO), # Variable siempre definida
+            amortizacion,
+            0.0,
+            saldo_final,
+            False
+        )
         saldo = saldo_final
-        fecha_actual += timedelta(days=salto_dias)
 
+def _filas_base_centavos(principal: float, tasa_per: float, cuota: float, n_periodos: int, frecuencia_pago: int, fecha_inicio: date, modo_fechas: str = MODO_DIAS) -> Iterator[tuple]:
+    """Versión en centavos enteros de _filas_base (ver generar_tabla_base con en_centavos=True)."""
+    saldo = round(principal * CENTAVOS)
+    cuota_c = round(cuota * CENTAVOS)
+    fechas = calendario.fechas_pago(fecha_inicio, frecuencia_pago, n_periodos, modo_fechas)
+
+    for periodo, fecha_actual in zip(range(1, n_periodos + 1), fechas):
+        # Única regla de redondeo: interés al centavo, mitades hacia arriba
+        interes = int(saldo * tasa_per + 0.5)
+        amortizacion = cuota_c - interes
+        saldo_final = saldo - amortizacion
+        cuota_periodo = cuota_c
+
+        # Última cuota o amortización mayor al saldo: cierre exacto
+        if periodo == n_periodos or saldo_final <= 0:
+            amortizacion = saldo
+            cuota_periodo = saldo + interes
+            saldo_final = 0
+
+        yield (periodo, fecha_actual, saldo / CENTAVOS, interes / CENTAVOS, cuota,
+               cuota_periodo / CENTAVOS, amortizacion / CENTAVOS, 0.0, saldo_final / CENTAVOS, False)
+        saldo = saldo_final
+
+def _fila_a_dict(valores: tuple) -> Dict:
+    """Convierte los valores de una fila en el diccionario que se expone al usuario."""
+    fila = dict(zip(COLUMNAS, valores))
+    fila['fecha'] = calendario.formatear(fila['fecha'])
+    return fila
+
+@instrumentar(filas=FILAS_RESULTADO)
+def generar_tabla_base(principal: float, tasa_per: float, cuota: float, n_periodos: int, frecuencia_pago: int, fecha_inicio: date, en_centavos: bool = False, modo_fechas: str = MODO_DIAS) -> TablaAmortizacion:
+    """Genera la tabla de amortización inicial.
+
+    Con en_centavos=True los montos se llevan como centavos enteros y el único redondeo es
+    el del interés de cada período (al centavo, mitades hacia arriba); el principal se
+    redondea al centavo al inicio. Es más rápido y no acumula error de punto flotante.
+    Frente al modo por defecto puede diferir en un centavo cuando saldo * tasa cae muy
+    cerca de medio centavo, y desde ahí en las filas siguientes.
+
+    modo_fechas elige el calendario de pagos (ver calendario.py): 'dias' usa saltos fijos
+    de round(365 / frecuencia) días y 'calendario' meses, quincenas y semanas reales.
+    """
+    tabla = TablaAmortizacion()
+    for valores in iterar_valores_base(principal, tasa_per, cuota, n_periodos, frecuencia_pago, fecha_inicio, en_centavos, modo_fechas):
+        tabla.agregar(*valores)
     return tabla
 
-def aplicar_abono_y_recalcular(tabla_original: List[Dict], periodo_abono: int, monto_abono: float, opcion_recalculo: str, tasa_per: float, plazo_original: int, frecuencia_pago: int) -> List[Dict]:
+@instrumentar(filas=FILAS_ITERADAS)
+def iterar_valores_base(principal: float, tasa_per: float, cuota: float, n_periodos: int, frecuencia_pago: int, fecha_inicio: date, en_centavos: bool = False, modo_fechas: str = MODO_DIAS) -> Iterator[tuple]:
+    """Filas de generar_tabla_base como tuplas en el orden de COLUMNAS (fecha como ordinal)."""
+    filas = _filas_base_centavos if en_centavos else _filas_base
+    return filas(principal, tasa_per, cuota, n_periodos, frecuencia_pago, fecha_inicio, modo_fechas)
+
+@instrumentar(filas=FILAS_ITERADAS)
+def iterar_tabla_base(principal: float, tasa_per: float, cuota: float, n_periodos: int, frecuencia_pago: int, fecha_inicio: date, en_centavos: bool = False, modo_fechas: str = MODO_DIAS) -> Iterator[Dict]:
+    """Versión generadora de generar_tabla_base: entrega las filas una a una."""
+    for valores in iterar_valores_base(principal, tasa_per, cuota, n_periodos, frecuencia_pago, fecha_inicio, en_centavos, modo_fechas):
+        yield _fila_a_dict(valores)
+
+@instrumentar(filas=FILAS_RESULTADO)
+def aplicar_abono_y_recalcular(tabla_original: TablaAmortizacion, periodo_abono: int, monto_abono: float, opcion_recalculo: str, tasa_per: float, plazo_original: int, frecuencia_pago: int) -> TablaAmortizacion:
     """Aplica un abono ad-hoc y recalcula el resto de la tabla."""
     
     idx = periodo_abono - 1
@@ -110,9 +214,8 @@ def aplicar_abono_y_recalcular(tabla_original: List[Dict], periodo_abono: int, m
     # 2. Recalcular a partir del período siguiente
     periodo_inicio_recalculo = periodo_abono + 1
     
-    # Ajuste de fechas para el re-cálculo
-    salto_dias = round(365 / frecuencia_pago)
-    fecha_actual = date.fromisoformat(tabla_original[idx]['fecha']) + timedelta(days=salto_dias)
+    # Las fechas del re-cálculo siguen el calendario de la tabla original (ordinales)
+    fechas = _fechas_tabla(tabla_original)
 
     if opcion_recalculo.lower() == 'plazo':
         # Opción 1: Reducción de Plazo (mantener cuota original)
@@ -136,7 +239,7 @@ def aplicar_abono_y_recalcular(tabla_original: List[Dict], periodo_abono: int, m
             
             tabla_nueva.append({
                 'periodo': periodo_inicio_recalculo,
-                'fecha': fecha_actual.strftime("%Y-%m-%d"),
+                'fecha': calendario.formatear(calendario.fecha_siguiente(fechas, periodo_inicio_recalculo, frecuencia_pago)),
                 'saldo_inicial': round(saldo, REDONDEO),
                 'interes': interes,
                 'cuota_original': tabla_original[idx]['cuota_original'],
@@ -148,7 +251,6 @@ def aplicar_abono_y_recalcular(tabla_original: List[Dict], periodo_abono: int, m
             })
             saldo = saldo_final
             periodo_inicio_recalculo += 1
-            fecha_actual += timedelta(days=salto_dias)
             
         return tabla_nueva
 
@@ -179,7 +281,7 @@ def aplicar_abono_y_recalcular(tabla_original: List[Dict], periodo_abono: int, m
 
             tabla_nueva.append({
                 'periodo': i + 1,
-                'fecha': fecha_actual.strftime("%Y-%m-%d"),
+                'fecha': calendario.formatear(calendario.fecha_siguiente(fechas, i + 1, frecuencia_pago)),
                 'saldo_inicial': round(saldo, REDONDEO),
                 'interes': interes,
                 'cuota_original': tabla_original[idx]['cuota_original'],
@@ -190,23 +292,253 @@ def aplicar_abono_y_recalcular(tabla_original: List[Dict], periodo_abono: int, m
                 'recalculado': True
             })
             saldo = saldo_final
-            fecha_actual += timedelta(days=salto_dias)
             
         return tabla_nueva
         
     else:
         raise ValueError("Opción de re-cálculo no válida. Use: PLAZO o CUOTA.")
 
-def exportar_tabla_csv(tabla: List[Dict], nombre_archivo: str = "tabla_amortizacion.csv"):
-    """Exporta la tabla a un archivo CSV."""
+def _agrupar_abonos(abonos: Iterable[Abono], n_filas: int) -> Dict[int, tuple]:
+    """Valida los abonos y los agrupa por período: {periodo: (monto_total, opcion)}."""
+    eventos = {}
+    for periodo, monto, opcion in abonos:
+        opcion = opcion.lower()
+        if opcion not in ('plazo', 'cuota'):
+            raise ValueError("Opción de re-cálculo no válida. Use: PLAZO o CUOTA.")
+        if periodo <= 0 or periodo > n_filas:
+            raise IndexError("El período de abono está fuera del rango de la tabla.")
+        monto_previo = eventos[periodo][0] if periodo in eventos else 0.0
+        eventos[periodo] = (monto_previo + monto, opcion)
+    return eventos
+
+def _valores_fila(fila) -> list:
+    """Extrae los valores de una fila tipo diccionario (fecha como ordinal)."""
+    valores = [fila[col] for col in COLUMNAS]
+    valores[1] = _a_ordinal(valores[1])
+    return valores
+
+def _fechas_tabla(tabla) -> Sequence[int]:
+    """Ordinales de las fechas de la tabla; en una TablaAmortizacion, sin convertir texto."""
+    if isinstance(tabla, TablaAmortizacion):
+        return tabla.columna('fecha')
+    return [_a_ordinal(fila['fecha']) for fila in tabla]
+
+def _filas_abonos(fila_abono: list, eventos: Dict[int, tuple], tasa_per: float, plazo_original: int, frecuencia_pago: int, fechas: Sequence[int]) -> Iterator[tuple]:
+    """Genera los valores de las filas desde la del primer abono hasta el final del crédito."""
+    periodo = fila_abono[0]
+    cuota_original = fila_abono[4]
+    cuota = fila_abono[5] if fila_abono[9] else cuota_original
+    saldo = fila_abono[8]
+    fecha_actual = fila_abono[1]
+    n_filas = len(fechas) # Las fechas siguen el calendario de la tabla original
+    salto_dias = calendario.salto_dias(frecuencia_pago) # Solo si el crédito se extiende más allá
+    fin = None # Último período del régimen CUOTA; None en régimen PLAZO
+    fila = fila_abono
+
+    while True:
+        # 1. Aplicar el abono del período y fijar el régimen de las filas siguientes
+        if periodo in eventos:
+            monto, opcion = eventos.pop(periodo)
+            saldo = round(saldo - monto, REDONDEO)
+            fila[7] = monto
+            fila[8] = saldo
+
+            if saldo <= CERO_FINANCIERO:
+                # Crédito saldado: las filas restantes quedan en cero
+                if eventos:
+                    raise ValueError(f"El crédito queda saldado en el período {periodo}; sobran abonos posteriores.")
+                yield tuple(fila)
+                for p in range(periodo + 1, n_filas + 1):
+                    yield (p, fechas[p - 1], 0.0, 0.0, cuota_original, 0.0, 0.0, 0.0, 0.0, True)
+                return
+
+            if opcion == 'plazo':
+                fin = None
+            else:
+                n_periodos_restantes = plazo_original - periodo
+                if n_periodos_restantes <= 0:
+                    raise ValueError("El abono con reducción de cuota debe ser anterior al plazo original.")
+                cuota = calcular_cuota_constante(saldo, tasa_per, n_periodos_restantes)
+                fin = plazo_original
+        yield tuple(fila)
+
+        # 2. Generar la fila del período siguiente según el régimen vigente
+        periodo += 1
+        fecha_actual = fechas[periodo - 1] if periodo <= n_filas else fecha_actual + salto_dias
+        if fin is None:
+            if saldo <= CERO_FINANCIERO or periodo > plazo_original + 100:
+                break
+            interes = round(saldo * tasa_per, REDONDEO)
+            if saldo + interes < cuota:
+                cuota_pagada = round(saldo + interes, REDONDEO)
+                amortizacion = saldo
+                saldo_final = 0.0
+            else:
+                cuota_pagada = cuota
+                amortizacion = round(cuota - interes, REDONDEO)
+                saldo_final = round(saldo - amortizacion, REDONDEO)
+        else:
+            if periodo > fin:
+                break
+            interes = round(saldo * tasa_per, REDONDEO)
+            if periodo == fin:
+                amortizacion = saldo
+                cuota_pagada = round(amortizacion + interes, REDONDEO)
+                saldo_final = 0.0
+            else:
+                amortizacion = round(cuota - interes, REDONDEO)
+                cuota_pagada = cuota
+                saldo_final = round(saldo - amortizacion, REDONDEO)
+
+        fila = [periodo, fecha_actual, round(saldo, REDONDEO), interes, cuota_original,
+                cuota_pagada, amortizacion, 0.0, saldo_final, True]
+        saldo = saldo_final
+
+    if eventos:
+        raise IndexError("El período de abono está fuera del rango de la tabla.")
+
+def _filas_abonos_centavos(fila_abono: list, eventos: Dict[int, tuple], tasa_per: float, plazo_original: int, frecuencia_pago: int, fechas: Sequence[int]) -> Iterator[tuple]:
+    """Versión en centavos enteros de _filas_abonos (mismo régimen PLAZO/CUOTA)."""
+    periodo = fila_abono[0]
+    cuota_original = fila_abono[4]
+    cuota = round((fila_abono[5] if fila_abono[9] else cuota_original) * CENTAVOS)
+    saldo = round(fila_abono[8] * CENTAVOS)
+    fecha_actual = fila_abono[1]
+    n_filas = len(fechas) # Las fechas siguen el calendario de la tabla original
+    salto_dias = calendario.salto_dias(frecuencia_pago) # Solo si el crédito se extiende más allá
+    fin = None # Último período del régimen CUOTA; None en régimen PLAZO
+    fila = fila_abono
+
+    while True:
+        # 1. Aplicar el abono del período y fijar el régimen de las filas siguientes
+        if periodo in eventos:
+            monto, opcion = eventos.pop(periodo)
+            saldo -= round(monto * CENTAVOS)
+            fila[7] = monto
+            fila[8] = saldo / CENTAVOS
+
+            if saldo <= 0:
+                # Crédito saldado: las filas restantes quedan en cero
+                if eventos:
+                    raise ValueError(f"El crédito queda saldado en el período {periodo}; sobran abonos posteriores.")
+                yield tuple(fila)
+                for p in range(periodo + 1, n_filas + 1):
+                    yield (p, fechas[p - 1], 0.0, 0.0, cuota_original, 0.0, 0.0, 0.0, 0.0, True)
+                return
+
+            if opcion == 'plazo':
+                fin = None
+            else:
+                n_periodos_restantes = plazo_original - periodo
+                if n_periodos_restantes <= 0:
+                    raise ValueError("El abono con reducción de cuota debe ser anterior al plazo original.")
+                cuota = round(calcular_cuota_constante(saldo / CENTAVOS, tasa_per, n_periodos_restantes) * CENTAVOS)
+                fin = plazo_original
+        yield tuple(fila)
+
+        # 2. Generar la fila del período siguiente según el régimen vigente
+        periodo += 1
+        fecha_actual = fechas[periodo - 1] if periodo <= n_filas else fecha_actual + salto_dias
+        if fin is None:
+            if saldo <= 0 or periodo > plazo_original + 100:
+                break
+            interes = int(saldo * tasa_per + 0.5)
+            if saldo + interes < cuota:
+                cuota_pagada = saldo + interes
+                amortizacion = saldo
+                saldo_final = 0
+            else:
+                cuota_pagada = cuota
+                amortizacion = cuota - interes
+                saldo_final = saldo - amortizacion
+        else:
+            if periodo > fin:
+                break
+            interes = int(saldo * tasa_per + 0.5)
+            if periodo == fin:
+                amortizacion = saldo
+                cuota_pagada = saldo + interes
+                saldo_final = 0
+            else:
+                amortizacion = cuota - interes
+                cuota_pagada = cuota
+                saldo_final = saldo - amortizacion
+
+        fila = [periodo, fecha_actual, saldo / CENTAVOS, interes / CENTAVOS, cuota_original,
+                cuota_pagada / CENTAVOS, amortizacion / CENTAVOS, 0.0, saldo_final / CENTAVOS, True]
+        saldo = saldo_final
+
+    if eventos:
+        raise IndexError("El período de abono está fuera del rango de la tabla.")
+
+@instrumentar(filas=FILAS_RESULTADO)
+def aplicar_abonos_y_recalcular(tabla_original: TablaAmortizacion, abonos: Iterable[Abono], tasa_per: float, plazo_original: int, frecuencia_pago: int, en_centavos: bool = False) -> TablaAmortizacion:
+    """Aplica una lista de abonos en un solo recorrido, sin modificar la tabla recibida.
+
+    Conserva las filas anteriores al primer abono y recalcula desde ahí. Cada abono cambia
+    el régimen de las filas siguientes: PLAZO mantiene la cuota vigente y acorta el crédito;
+    CUOTA recalcula la cuota con los períodos que faltan hasta el plazo original. Los abonos
+    de un mismo período se suman y prevalece la opción del último. en_centavos funciona
+    como en generar_tabla_base.
+
+    Diferencias con encadenar aplicar_abono_y_recalcular: no se repite la fila que la rama
+    PLAZO deja duplicada; PLAZO mantiene la cuota vigente en lugar de volver a
+    cuota_original; y las filas en cero que siguen a un abono que salda el crédito se marcan
+    como recalculadas. Como en la versión original, si el abono supera el saldo la fila del
+    abono guarda el saldo negativo.
+    """
+    eventos = _agrupar_abonos(abonos, len(tabla_original))
+    if not eventos:
+        return TablaAmortizacion.desde_filas(tabla_original[:])
+
+    # Copiar las filas anteriores al primer abono; desde ahí se recalcula
+    primero = min(eventos)
+    tabla_nueva = tabla_original[:primero - 1]
+    if not isinstance(tabla_nueva, TablaAmortizacion):
+        tabla_nueva = TablaAmortizacion.desde_filas(tabla_nueva)
+    fila_abono = _valores_fila(tabla_original[primero - 1])
+    filas = _filas_abonos_centavos if en_centavos else _filas_abonos
+    for valores in filas(fila_abono, eventos, tasa_per, plazo_original, frecuencia_pago, _fechas_tabla(tabla_original)):
+        tabla_nueva.agregar(*valores)
+    return tabla_nueva
+
+@instrumentar(filas=FILAS_ITERADAS)
+def iterar_abonos_y_recalcular(tabla_original: TablaAmortizacion, abonos: Iterable[Abono], tasa_per: float, plazo_original: int, frecuencia_pago: int, en_centavos: bool = False) -> Iterator[Dict]:
+    """Versión generadora de aplicar_abonos_y_recalcular: entrega las filas una a una."""
+    eventos = _agrupar_abonos(abonos, len(tabla_original))
+    primero = min(eventos) if eventos else len(tabla_original) + 1
+    for idx in range(primero - 1):
+        yield dict(tabla_original[idx])
+    if eventos:
+        fila_abono = _valores_fila(tabla_original[primero - 1])
+        filas = _filas_abonos_centavos if en_centavos else _filas_abonos
+        for valores in filas(fila_abono, eventos, tasa_per, plazo_original, frecuencia_pago, _fechas_tabla(tabla_original)):
+            yield _fila_a_dict(valores)
+
+@instrumentar(filas=FILAS_ARGUMENTO)
+def exportar_tabla_csv(tabla: Iterable[Dict], nombre_archivo: str = "tabla_amortizacion.csv", tamano_bloque: int = 4096):
+    """Exporta la tabla a un archivo CSV.
+
+    Acepta cualquier iterable de filas (incluidos los generadores iterar_*) y escribe por
+    bloques de `tamano_bloque` filas, sin cargar la tabla completa en memoria.
+    """
     import csv
-    if not tabla:
+    from itertools import islice
+
+    filas = iter(tabla)
+    primera = next(filas, None)
+    if primera is None:
         return
     
-    keys = tabla[0].keys()
-    with open(nombre_archivo, 'w', newline='', encoding='utf-8') as output_file:
+    keys = primera.keys()
+    with open(nombre_archivo, 'w', newline='', encoding='utf-8', buffering=1 << 20) as output_file:
         dict_writer = csv.DictWriter(output_file, fieldnames=keys)
         dict_writer.writeheader()
-        dict_writer.writerows(tabla)
+        dict_writer.writerow(primera)
+        while True:
+            bloque = list(islice(filas, tamano_bloque))
+            if not bloque:
+                break
+            dict_writer.writerows(bloque)
     
     return f"Tabla exportada a {nombre_archivo}"
\ No newline at end of file
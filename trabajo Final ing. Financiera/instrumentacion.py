@@ -0,0 +1,301 @@
+"""Instrumentación opcional de las funciones críticas del motor financiero.
+
+Las funciones decoradas con `instrumentar` acumulan llamadas, filas producidas, tiempo y
+'bloques_netos' mientras la instrumentación está activa. 'bloques_netos' es la variación
+neta de los bloques de memoria vivos de todo el proceso (sys.getallocatedblocks) durante
+las llamadas: no es un conteo de asignaciones, puede ser negativa e incluye lo que hagan
+otros hilos en ese lapso (por ejemplo, el hilo de Tk mientras calcula TrabajadorCalculo).
+Para contar asignaciones por línea, use `capturar()` (tracemalloc). Desactivada no cuesta nada: el módulo conserva las funciones originales, y al
+activarla se reemplazan por sus envolturas en el espacio de nombres del módulo y en los
+módulos ya cargados que las importaron con `from financiero import funcion`. Solo quedan
+sin medir las referencias guardadas en otros lugares (atributos, listas, argumentos por
+defecto) antes de activar.
+
+En las funciones que devuelven iteradores (FILAS_ITERADAS) se miden las filas a medida que
+se consumen: el tiempo es el que pasa dentro del iterador, sin contar al consumidor.
+
+Se activa con la variable de entorno ING_FIN_INSTRUMENTAR=1 (y opcionalmente
+ING_FIN_INSTRUMENTAR_JSON=ruta para volcar las estadísticas al salir) o en código:
+
+    with instrumentacion.instrumentado():
+        ...
+    print(instrumentacion.estadisticas())
+
+Para investigaciones puntuales, `capturar()` ejecuta el bloque con cProfile y tracemalloc.
+"""
+import atexit
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+VARIABLE_ENTORNO = 'ING_FIN_INSTRUMENTAR'
+VARIABLE_JSON = 'ING_FIN_INSTRUMENTAR_JSON'
+
+# Cómo contar las filas de cada llamada
+FILAS_RESULTADO = 'resultado'   # len() del valor devuelto
+FILAS_ARGUMENTO = 'argumento'   # filas consumidas del primer argumento (iterable)
+FILAS_ITERADAS = 'iteradas'     # filas entregadas por el iterador devuelto, al consumirlo
+
+_activo = os.environ.get(VARIABLE_ENTORNO, '').strip().lower() not in ('', '0', 'no', 'false')
+_bloqueo = threading.Lock()
+_estadisticas: Dict[str, Dict] = {}
+_registradas: List[tuple] = [] # (espacio de nombres, nombre, original, envoltura)
+
+
+def _nueva_entrada() -> Dict:
+    return {'llamadas': 0, 'filas': 0, 'segundos': 0.0, 'bloques_netos': 0, 'errores': 0}
+
+
+class _Contador:
+    """Iterador que cuenta las filas que consume la función instrumentada."""
+
+    __slots__ = ('_iterador', 'filas')
+
+    def __init__(self, iterable: Iterable):
+        self._iterador = iter(iterable)
+        self.filas = 0
+
+    def __iter__(self) -> Iterator:
+        return self
+
+    def __next__(self):
+        valor = next(self._iterador)
+        self.filas += 1
+        return valor
+
+
+def _registrar(clave: str, n_filas: int, segundos: float, bloques_netos: int, error: bool):
+    with _bloqueo:
+        entrada = _estadisticas.setdefault(clave, _nueva_entrada())
+        entrada['llamadas'] += 1
+        entrada['filas'] += n_filas
+        entrada['segundos'] += segundos
+        entrada['bloques_netos'] += bloques_netos
+        entrada['errores'] += error
+
+
+def _iterar_medido(iterador: Iterator, clave: str, segundos: float, bloques_netos: int) -> Iterator:
+    """Entrega las filas de `iterador` midiendo solo el tiempo que pasa dentro de él.
+
+    La llamada se registra al agotarse o cerrarse el iterador.
+    """
+    reloj = time.perf_counter
+    n_filas = 0
+    error = False
+    try:
+        while True:
+            bloques = sys.getallocatedblocks()
+            inicio = reloj()
+            try:
+                fila = next(iterador)
+            except StopIteration:
+                return
+            finally:
+                segundos += reloj() - inicio
+                bloques_netos += sys.getallocatedblocks() - bloques
+            n_filas += 1
+            yield fila
+    except GeneratorExit:
+        raise # El consumidor dejó de iterar antes del final: no es un error
+    except BaseException:
+        error = True
+        raise
+    finally:
+        cerrar = getattr(iterador, 'close', None)
+        if cerrar is not None:
+            cerrar()
+        _registrar(clave, n_filas, segundos, bloques_netos, error)
+
+
+def instrumentar(nombre: Optional[str] = None, filas: Optional[str] = None) -> Callable:
+    """Decorador: registra la función en las estadísticas bajo `nombre`.
+
+    `filas` indica cómo contar las filas producidas: FILAS_RESULTADO, FILAS_ARGUMENTO,
+    FILAS_ITERADAS o None para no contarlas.
+    """
+    def decorador(funcion: Callable) -> Callable:
+        clave = nombre or funcion.__name__
+        _estadisticas.setdefault(clave, _nueva_entrada())
+
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if filas == FILAS_ITERADAS:
+                bloques = sys.getallocatedblocks()
+                inicio = time.perf_counter()
+                try:
+                    iterador = iter(funcion(*args, **kwargs))
+                except BaseException:
+                    _registrar(clave, 0, time.perf_counter() - inicio, sys.getallocatedblocks() - bloques, True)
+                    raise
+                return _iterar_medido(iterador, clave, time.perf_counter() - inicio, sys.getallocatedblocks() - bloques)
+
+            contador = None
+            if filas == FILAS_ARGUMENTO and args:
+                contador = _Contador(args[0])
+                args = (contador,) + args[1:]
+            bloques = sys.getallocatedblocks()
+            inicio = time.perf_counter()
+            error = False
+            resultado = None
+            try:
+                resultado = funcion(*args, **kwargs)
+                return resultado
+            except BaseException:
+                error = True
+                raise
+            finally:
+                segundos = time.perf_counter() - inicio
+                bloques_netos = sys.getallocatedblocks() - bloques
+                if contador is not None:
+                    n_filas = contador.filas
+                elif filas == FILAS_RESULTADO and not error and hasattr(resultado, '__len__'):
+                    n_filas = len(resultado)
+                else:
+                    n_filas = 0
+                _registrar(clave, n_filas, segundos, bloques_netos, error)
+
+        _registradas.append((funcion.__globals__, funcion.__name__, funcion, envoltura))
+        return envoltura if _activo else funcion
+    return decorador
+
+
+# --- Control ---
+
+def _instalar(activa: bool):
+    """Pone la envoltura (activa) o la función original en su módulo y donde se haya importado."""
+    global _activo
+    _activo = activa
+    reemplazos = {}
+    for espacio, nombre, original, envoltura in _registradas:
+        anterior, nueva = (original, envoltura) if activa else (envoltura, original)
+        espacio[nombre] = nueva
+        reemplazos[id(anterior)] = (anterior, nueva)
+
+    # Nombres importados con `from modulo import funcion` en los módulos ya cargados
+    for modulo in list(sys.modules.values()):
+        espacio = getattr(modulo, '__dict__', None)
+        if not isinstance(espacio, dict):
+            continue
+        for nombre, valor in list(espacio.items()):
+            par = reemplazos.get(id(valor))
+            if par is not None and par[0] is valor:
+                espacio[nombre] = par[1]
+
+
+def activar():
+    _instalar(True)
+
+
+def desactivar():
+    _instalar(False)
+
+
+def activo() -> bool:
+    return _activo
+
+
+@contextmanager
+def instrumentado(reiniciar_estadisticas: bool = False):
+    """Activa la instrumentación dentro del bloque y restaura el estado anterior al salir."""
+    previo = _activo
+    if reiniciar_estadisticas:
+        reiniciar()
+    _instalar(True)
+    try:
+        yield
+    finally:
+        _instalar(previo)
+
+
+# --- Consulta ---
+
+def estadisticas() -> Dict[str, Dict]:
+    """Copia de las estadísticas acumuladas, con el tiempo medio por llamada y por fila."""
+    with _bloqueo:
+        copia = {clave: dict(valores) for clave, valores in _estadisticas.items()}
+    for valores in copia.values():
+        llamadas, n_filas = valores['llamadas'], valores['filas']
+        valores['us_por_llamada'] = valores['segundos'] * 1e6 / llamadas if llamadas else 0.0
+        valores['us_por_fila'] = valores['segundos'] * 1e6 / n_filas if n_filas else 0.0
+    return copia
+
+
+def reiniciar():
+    """Pone en cero los contadores (conserva las funciones registradas)."""
+    with _bloqueo:
+        for clave in _estadisticas:
+            _estadisticas[clave] = _nueva_entrada()
+
+
+def volcar_json(ruta: str):
+    """Guarda las estadísticas en un archivo JSON."""
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump({'activo': _activo, 'funciones': estadisticas()}, archivo, indent=2, ensure_ascii=False)
+    return f"Estadísticas guardadas en {ruta}"
+
+
+def resumen() -> str:
+    """Una línea con las funciones más costosas (para la barra de estado de la interfaz)."""
+    usadas = sorted(((v['segundos'], clave, v) for clave, v in estadisticas().items() if v['llamadas']), reverse=True)
+    if not usadas:
+        return "Instrumentación: sin llamadas registradas."
+    partes = [f"{clave}: {v['llamadas']}x {v['segundos'] * 1000:,.1f} ms {v['filas']:,} filas" for _, clave, v in usadas[:3]]
+    return " | ".join(partes)
+
+
+# --- Captura puntual con cProfile y tracemalloc ---
+
+class Captura:
+    """Resultado de `capturar`: perfil de cProfile y principales sitios de asignación."""
+
+    def __init__(self):
+        self.perfil: Optional[pstats.Stats] = None
+        self.asignaciones: List[tracemalloc.StatisticDiff] = []
+        self.memoria_pico = 0
+
+    def informe(self, lineas: int = 15) -> str:
+        salida = io.StringIO()
+        if self.perfil is not None:
+            self.perfil.stream = salida
+            self.perfil.sort_stats('cumulative').print_stats(lineas)
+        salida.write(f"Memoria pico: {self.memoria_pico / 1024:,.1f} KiB\n")
+        for estadistica in self.asignaciones[:lineas]:
+            salida.write(f"{estadistica}\n")
+        return salida.getvalue()
+
+
+@contextmanager
+def capturar(ruta_perfil: Optional[str] = None, marcos: int = 5):
+    """Ejecuta el bloque bajo cProfile y tracemalloc; opcionalmente guarda el perfil (.prof)."""
+    captura = Captura()
+    tracemalloc_previo = tracemalloc.is_tracing()
+    if not tracemalloc_previo:
+        tracemalloc.start(marcos)
+    antes = tracemalloc.take_snapshot()
+    perfilador = cProfile.Profile()
+    perfilador.enable()
+    try:
+        yield captura
+    finally:
+        perfilador.disable()
+        despues = tracemalloc.take_snapshot()
+        captura.memoria_pico = tracemalloc.get_traced_memory()[1]
+        if not tracemalloc_previo:
+            tracemalloc.stop()
+        captura.asignaciones = despues.compare_to(antes, 'lineno')
+        captura.perfil = pstats.Stats(perfilador)
+        if ruta_perfil:
+            perfilador.dump_stats(ruta_perfil)
+
+
+if os.environ.get(VARIABLE_JSON):
+    atexit.register(volcar_json, os.environ[VARIABLE_JSON])
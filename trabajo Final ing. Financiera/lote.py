@@ -0,0 +1,269 @@
+"""Procesamiento de una cartera de créditos por línea de comandos (sin interfaz gráfica).
+
+Uso:
+    python lote.py cartera.csv --salida resultados --trabajadores 8 --bloque 256
+
+La cartera puede ser CSV o JSONL (una línea JSON por crédito) con las columnas:
+id (opcional), monto, tasa (en %, como en la interfaz), plazo, frecuencia (número de
+pagos al año o nombre, ej: 12 o "Mensual"), tipo_tasa, fecha_inicio (YYYY-MM-DD, obligatoria),
+calendario (opcional: "dias" o "calendario", ver calendario.py) y abonos (opcional). En CSV los abonos se escriben "periodo:monto:opcion" separados por
+';'; en JSONL como lista de [periodo, monto, opcion].
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date
+from itertools import islice
+from typing import Dict, Iterator, List
+
+import financiero
+from calendario import MODO_DIAS, MODOS_FECHAS
+from financiero import FRECUENCIAS_ANUALES, Abono
+from tabla import TablaAmortizacion
+
+# Frecuencias aceptadas por nombre ("mensual") además de la etiqueta de la interfaz
+_FRECUENCIAS_POR_NOMBRE = {nombre.split(' ')[0].lower(): valor for nombre, valor in FRECUENCIAS_ANUALES.items()}
+
+ERROR_LECTURA = '_error_lectura' # Clave del registro que reemplaza a una línea ilegible de la cartera
+
+COLUMNAS_RESUMEN = ('id', 'tasa_periodica', 'cuota', 'periodos', 'interes_total', 'abonos_total', 'total_pagado', 'error',
+                    'archivo')
+
+
+def _leer_frecuencia(valor) -> int:
+    """Interpreta la frecuencia como número de pagos al año (12 o 12.0), nombre o etiqueta de la interfaz."""
+    if isinstance(valor, int):
+        return valor
+    texto = str(valor).strip()
+    if texto in FRECUENCIAS_ANUALES:
+        return FRECUENCIAS_ANUALES[texto]
+    if texto.lower() in _FRECUENCIAS_POR_NOMBRE:
+        return _FRECUENCIAS_POR_NOMBRE[texto.lower()]
+    try:
+        return int(texto)
+    except ValueError:
+        numero = float(texto) # Los clientes JSON suelen enviar 12.0
+        if not numero.is_integer():
+            raise ValueError(f"Frecuencia no válida: {valor}") from None
+        return int(numero)
+
+
+def _leer_abonos(valor) -> List[Abono]:
+    """Interpreta los abonos de un registro (texto 'p:m:o;...' o lista JSON)."""
+    if not valor:
+        return []
+    if isinstance(valor, str):
+        valor = [parte.split(':') for parte in valor.split(';') if parte.strip()]
+    abonos = []
+    for abono in valor:
+        if isinstance(abono, dict):
+            abono = (abono['periodo'], abono['monto'], abono['opcion'])
+        periodo, monto, opcion = abono
+        abonos.append(Abono(int(periodo), float(monto), str(opcion).strip().upper()))
+    return abonos
+
+
+def normalizar_prestamo(registro: Dict, numero: int) -> Dict:
+    """Valida un registro de la cartera y lo lleva a los tipos que usa el motor."""
+    if ERROR_LECTURA in registro:
+        raise ValueError(registro[ERROR_LECTURA])
+    prestamo = {
+        'id': str(registro.get('id') or numero),
+        'monto': float(registro['monto']),
+        'tasa': float(registro['tasa']) / 100.0, # Porcentaje a factor, como en la interfaz
+        'plazo': int(registro['plazo']),
+        'frecuencia': _leer_frecuencia(registro.get('frecuencia') or 12),
+        'tipo_tasa': str(registro.get('tipo_tasa') or 'NOMINAL').strip().upper(),
+        'fecha_inicio': str(registro.get('fecha_inicio') or '').strip(),
+        'calendario': str(registro.get('calendario') or MODO_DIAS).strip().lower(),
+        'abonos': _leer_abonos(registro.get('abonos')),
+    }
+    if prestamo['monto'] <= 0 or prestamo['tasa'] <= 0 or prestamo['plazo'] <= 0 or prestamo['frecuencia'] <= 0:
+        raise ValueError(f"Crédito {prestamo['id']}: todos los valores deben ser positivos.")
+    if not prestamo['fecha_inicio']:
+        # Obligatoria: con la fecha del día el mismo registro cambiaría de clave cada día
+        raise ValueError(f"Crédito {prestamo['id']}: falta fecha_inicio (YYYY-MM-DD).")
+    if prestamo['calendario'] not in MODOS_FECHAS:
+        raise ValueError(f"Crédito {prestamo['id']}: calendario no reconocido. Use: {', '.join(MODOS_FECHAS)}.")
+    date.fromisoformat(prestamo['fecha_inicio'])
+    return prestamo
+
+
+def clave_prestamo(prestamo: Dict) -> str:
+    """Parámetros normalizados de un crédito (sin su id) como JSON canónico; sirve de clave de caché."""
+    return json.dumps({k: v for k, v in prestamo.items() if k != 'id'}, sort_keys=True, separators=(',', ':'))
+
+
+def _leer_linea_json(linea: str, numero_linea: int) -> Dict:
+    """Registro de una línea JSONL; si no es un objeto JSON válido, un registro con ERROR_LECTURA."""
+    try:
+        registro = json.loads(linea)
+    except ValueError as e:
+        return {ERROR_LECTURA: f"Línea {numero_linea}: JSON no válido ({e})."}
+    if not isinstance(registro, dict):
+        return {ERROR_LECTURA: f"Línea {numero_linea}: se esperaba un objeto JSON."}
+    return registro
+
+
+def leer_cartera(ruta: str) -> Iterator[Dict]:
+    """Lee la cartera (CSV o JSONL) registro a registro, sin cargarla completa.
+
+    Una línea JSONL ilegible no detiene la lectura: se entrega como registro con
+    ERROR_LECTURA, que normalizar_prestamo rechaza como cualquier otro registro inválido.
+    """
+    with open(ruta, newline='', encoding='utf-8') as archivo:
+        if ruta.lower().endswith(('.jsonl', '.json')):
+            registros = (_leer_linea_json(linea, numero) for numero, linea in enumerate(archivo, start=1)
+                         if linea.strip())
+        else:
+            registros = csv.DictReader(archivo)
+        yield from registros
+
+
+def calcular_prestamo(prestamo: Dict) -> TablaAmortizacion:
+    """Genera la tabla de un crédito normalizado, con sus abonos aplicados."""
+    tasa_per = financiero.calcular_tasa_periodica(prestamo['tasa'], prestamo['frecuencia'], prestamo['tipo_tasa'])
+    cuota = financiero.calcular_cuota_constante(prestamo['monto'], tasa_per, prestamo['plazo'])
+    tabla = financiero.generar_tabla_base(
+        prestamo['monto'], tasa_per, cuota, prestamo['plazo'], prestamo['frecuencia'],
+        date.fromisoformat(prestamo['fecha_inicio']), modo_fechas=prestamo['calendario']
+    )
+    if prestamo['abonos']:
+        tabla = financiero.aplicar_abonos_y_recalcular(
+            tabla, prestamo['abonos'], tasa_per, prestamo['plazo'], prestamo['frecuencia']
+        )
+    return tabla
+
+
+def _resumir(prestamo: Dict, tabla: TablaAmortizacion) -> Dict:
+    """Totales de un crédito para el archivo de resumen."""
+    cuotas = tabla.columna('cuota_pagada')
+    interes_total = round(sum(tabla.columna('interes')), financiero.REDONDEO)
+    abonos_total = round(sum(tabla.columna('abono_adhoc')), financiero.REDONDEO)
+    return {
+        'id': prestamo['id'],
+        'tasa_periodica': financiero.calcular_tasa_periodica(prestamo['tasa'], prestamo['frecuencia'], prestamo['tipo_tasa']),
+        'cuota': tabla[0]['cuota_original'],
+        'periodos': sum(1 for cuota in cuotas if cuota > 0),
+        'interes_total': interes_total,
+        'abonos_total': abonos_total,
+        'total_pagado': round(sum(cuotas) + abonos_total, financiero.REDONDEO),
+        'error': '',
+    }
+
+
+def _nombre_base(id_prestamo: str) -> str:
+    """Nombre del CSV de un crédito, sin extensión ni sufijo."""
+    return "prestamo_" + "".join(c if c.isalnum() or c in '-_' else '_' for c in id_prestamo)
+
+
+def _nombre_archivo(id_prestamo: str, usados: set) -> str:
+    """Nombre del CSV de un crédito; si ya se usó (ids repetidos o que se sanean igual), agrega un sufijo.
+
+    La comparación ignora mayúsculas, para sistemas de archivos que no las distinguen.
+    """
+    base = _nombre_base(id_prestamo)
+    nombre, sufijo = base, 1
+    while nombre.lower() in usados:
+        sufijo += 1
+        nombre = f"{base}_{sufijo}"
+    usados.add(nombre.lower())
+    return nombre + ".csv"
+
+
+def _procesar_bloque(bloque: List[tuple], dir_salida: str) -> List[Dict]:
+    """Trabajo de cada proceso: calcula y exporta un bloque de créditos (archivo None: sin tabla)."""
+    resumen = []
+    for numero, registro, archivo in bloque:
+        try:
+            prestamo = normalizar_prestamo(registro, numero)
+            tabla = calcular_prestamo(prestamo)
+            if archivo:
+                financiero.exportar_tabla_csv(tabla, os.path.join(dir_salida, archivo))
+            fila = _resumir(prestamo, tabla)
+            fila['archivo'] = archivo or ''
+            resumen.append(fila)
+        except Exception as e:
+            resumen.append({'id': str(registro.get('id') or numero), 'error': str(e)})
+    return resumen
+
+
+def procesar_cartera(ruta: str, dir_salida: str, trabajadores: int = None, tamano_bloque: int = 256,
+                     escribir_tablas: bool = True) -> Dict:
+    """Reparte la cartera en bloques entre procesos y escribe las tablas y el resumen.
+
+    Mantiene a lo sumo dos bloques pendientes por trabajador, así la cartera se lee en
+    flujo; lo único que crece con la cartera es el conjunto de nombres de archivo usados.
+    Los créditos cuyo nombre de archivo ya estaba usado se escriben con un sufijo (_2, _3...)
+    y se cuentan en 'renombrados'; el resumen indica el archivo de cada uno.
+    """
+    trabajadores = trabajadores or os.cpu_count() or 1
+    os.makedirs(dir_salida, exist_ok=True)
+    registros = enumerate(leer_cartera(ruta), start=1)
+    procesados = errores = renombrados = 0
+    usados = set()
+    inicio = time.perf_counter()
+
+    with open(os.path.join(dir_salida, 'resumen.csv'), 'w', newline='', encoding='utf-8') as archivo_resumen, \
+            ProcessPoolExecutor(max_workers=trabajadores) as ejecutor:
+        escritor = csv.DictWriter(archivo_resumen, fieldnames=COLUMNAS_RESUMEN, restval='')
+        escritor.writeheader()
+        pendientes = set()
+        agotado = False
+        while pendientes or not agotado:
+            while not agotado and len(pendientes) < 2 * trabajadores:
+                bloque = []
+                for numero, registro in islice(registros, tamano_bloque):
+                    archivo = None
+                    if escribir_tablas:
+                        id_prestamo = str(registro.get('id') or numero)
+                        archivo = _nombre_archivo(id_prestamo, usados)
+                        renombrados += archivo != _nombre_base(id_prestamo) + ".csv"
+                    bloque.append((numero, registro, archivo))
+                if not bloque:
+                    agotado = True
+                    break
+                pendientes.add(ejecutor.submit(_procesar_bloque, bloque, dir_salida))
+            if not pendientes:
+                break
+            listos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                resumen = futuro.result()
+                escritor.writerows(resumen)
+                procesados += len(resumen)
+                errores += sum(1 for fila in resumen if fila['error'])
+
+    segundos = time.perf_counter() - inicio
+    return {
+        'prestamos': procesados,
+        'errores': errores,
+        'renombrados': renombrados,
+        'segundos': segundos,
+        'prestamos_por_segundo': procesados / segundos if segundos > 0 else 0.0,
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Genera las tablas de amortización de una cartera sin interfaz gráfica.")
+    parser.add_argument('entrada', help="Archivo de cartera (.csv o .jsonl).")
+    parser.add_argument('--salida', default='resultados', help="Directorio de salida (tablas y resumen.csv).")
+    parser.add_argument('--trabajadores', type=int, default=None, help="Número de procesos (por defecto, núcleos disponibles).")
+    parser.add_argument('--bloque', type=int, default=256, help="Créditos por bloque enviado a cada proceso.")
+    parser.add_argument('--solo-resumen', action='store_true', help="No escribir la tabla de cada crédito.")
+    args = parser.parse_args(argv)
+
+    resultado = procesar_cartera(args.entrada, args.salida, args.trabajadores, args.bloque,
+                                 escribir_tablas=not args.solo_resumen)
+    print(f"{resultado['prestamos']} créditos procesados ({resultado['errores']} con error) "
+          f"en {resultado['segundos']:.2f} s: {resultado['prestamos_por_segundo']:,.1f} créditos/s")
+    if resultado['renombrados']:
+        print(f"{resultado['renombrados']} tablas cuyo nombre de archivo coincidía con otro se escribieron con sufijo (ver columna archivo del resumen).")
+    return 1 if resultado['errores'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
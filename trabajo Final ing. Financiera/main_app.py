@@ -1,20 +1,20 @@
+import os
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from datetime import date
-from typing import List, Dict
 import financiero # Importamos nuestro módulo de cálculos
+import instrumentacion
+from calendario import MODO_CALENDARIO, MODO_DIAS
+from financiero import FRECUENCIAS_ANUALES
+from tabla import TablaAmortizacion
+from tareas import Cancelado, TrabajadorCalculo
+from vista_tabla import TablaVirtual
 
-# --- Diccionario de Frecuencias Estándar ---
-FRECUENCIAS_ANUALES = {
-    "Mensual (12)": 12,
-    "Quincenal (24)": 24,
-    "Bimestral (6)": 6,
-    "Trimestral (4)": 4,
-    "Semestral (2)": 2,
-    "Anual (1)": 1,
-    "Semanal (52)": 52,
+# Calendarios de pago disponibles en la interfaz (ver calendario.py)
+CALENDARIOS = {
+    "Días fijos (365/f)": MODO_DIAS,
+    "Meses reales": MODO_CALENDARIO,
 }
-# ---------------------------------------------
 
 class AmortizacionApp:
     def __init__(self, master):
@@ -28,27 +28,36 @@ class AmortizacionApp:
         self.frecuencia_nombre = tk.StringVar(value="Mensual (12)") 
         self.tipo_tasa = tk.StringVar(value="NOMINAL")
         self.fecha_inicio = tk.StringVar(value=date.today().strftime("%Y-%m-%d"))
+        self.calendario_nombre = tk.StringVar(value="Días fijos (365/f)")
 
         # Estilo ttk
         style = ttk.Style()
         style.theme_use('clam')
         
-        self.tabla_amortizacion: List[Dict] = []
+        self.tabla_amortizacion = TablaAmortizacion()
         self.tasa_per = 0.0
         self.cuota_original = 0.0
 
+        # Cálculos y exportaciones corren en segundo plano para no bloquear la ventana
+        self.trabajador = TrabajadorCalculo(master)
+        self.tarea_actual = None
+        for var in (self.monto, self.tasa, self.plazo, self.frecuencia_nombre, self.tipo_tasa, self.fecha_inicio, self.calendario_nombre):
+            var.trace_add('write', self.parametros_modificados)
+
         # Crear la interfaz
         self.crear_widgets_parametros()
         self.crear_widgets_tabla()
         self.crear_widgets_acciones()
+        if instrumentacion.activo():
+            self.crear_barra_estado()
 
     # --- 1. Widgets de Entrada de Parámetros ---
     def crear_widgets_parametros(self):
         frame_params = ttk.LabelFrame(self.master, text="  Parámetros del Crédito  ")
         frame_params.pack(padx=10, pady=10, fill="x")
 
-        labels = ["Monto Crédito ($):", "Tasa Anual (%):", "Plazo (períodos totales):", "Frecuencia Pago:", "Tipo de Tasa:"]
-        vars_list = [self.monto, self.tasa, self.plazo, self.frecuencia_nombre, self.tipo_tasa]
+        labels = ["Monto Crédito ($):", "Tasa Anual (%):", "Plazo (períodos totales):", "Frecuencia Pago:", "Tipo de Tasa:", "Calendario de Pagos:"]
+        vars_list = [self.monto, self.tasa, self.plazo, self.frecuencia_nombre, self.tipo_tasa, self.calendario_nombre]
         
         for i, label_text in enumerate(labels):
             label = ttk.Label(frame_params, text=label_text)
@@ -60,34 +69,25 @@ class AmortizacionApp:
             elif i == 3: # Frecuencia Pago (Combobox)
                 combo = ttk.Combobox(frame_params, textvariable=vars_list[i], values=list(FRECUENCIAS_ANUALES.keys()), width=13, state="readonly")
                 combo.grid(row=i, column=1, padx=5, pady=3, sticky="ew")
-            else: # Tipo de Tasa (Combobox)
+            elif i == 4: # Tipo de Tasa (Combobox)
                 combo = ttk.Combobox(frame_params, textvariable=vars_list[i], values=["NOMINAL", "EFECTIVA", "ANTICIPADA"], width=13, state="readonly")
                 combo.grid(row=i, column=1, padx=5, pady=3, sticky="ew")
+            else: # Calendario de Pagos (Combobox)
+                combo = ttk.Combobox(frame_params, textvariable=vars_list[i], values=list(CALENDARIOS.keys()), width=13, state="readonly")
+                combo.grid(row=i, column=1, padx=5, pady=3, sticky="ew")
 
         # Botón para Generar Tabla
         btn_generar = ttk.Button(frame_params, text="Generar Tabla", command=self.generar_tabla)
-        btn_generar.grid(row=0, column=2, rowspan=5, padx=10, pady=5, sticky="ns")
+        btn_generar.grid(row=0, column=2, rowspan=6, padx=10, pady=5, sticky="ns")
 
     # --- 2. Widgets de la Tabla de Amortización (Treeview) ---
     def crear_widgets_tabla(self):
         frame_tabla = ttk.LabelFrame(self.master, text="  Tabla de Amortización  ")
         frame_tabla.pack(padx=10, pady=5, fill="both", expand=True)
 
-        # Definir Columnas
-        columnas = ('periodo', 'fecha', 'saldo_inicial', 'interes', 'cuota_pagada', 'amortizacion', 'abono_adhoc', 'saldo_final')
-        self.tree = ttk.Treeview(frame_tabla, columns=columnas, show='headings')
-
-        # Configurar Encabezados
-        for col in columnas:
-            self.tree.heading(col, text=col.replace('_', ' ').title())
-            self.tree.column(col, anchor='center', width=100)
-
-        # Scrollbar vertical
-        vsb = ttk.Scrollbar(frame_tabla, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=vsb.set)
-        vsb.pack(side='right', fill='y')
-
-        self.tree.pack(fill="both", expand=True)
+        # Tabla virtualizada: solo crea los items visibles y actualiza los que cambian
+        self.vista_tabla = TablaVirtual(frame_tabla)
+        self.tree = self.vista_tabla.tree
     
     # --- 3. Widgets de Abonos y Acciones ---
     def crear_widgets_acciones(self):
@@ -114,7 +114,24 @@ class AmortizacionApp:
         # Sección Exportar
         btn_exportar = ttk.Button(frame_acciones, text="Exportar a CSV", command=self.exportar_csv)
         btn_exportar.grid(row=0, column=7, padx=10, pady=5)
+
+        # Progreso de la tarea en segundo plano
+        self.barra_progreso = ttk.Progressbar(frame_acciones, mode='determinate', maximum=100)
+        self.barra_progreso.grid(row=1, column=0, columnspan=6, padx=5, pady=3, sticky="ew")
+        self.btn_cancelar = ttk.Button(frame_acciones, text="Cancelar", command=self.cancelar_tarea, state='disabled')
+        self.btn_cancelar.grid(row=1, column=6, padx=10, pady=3)
     
+    # --- 4. Barra de estado de la instrumentación (solo si está activa) ---
+    def crear_barra_estado(self):
+        self.estado = tk.StringVar(value=instrumentacion.resumen())
+        ttk.Label(self.master, textvariable=self.estado, anchor='w', relief='sunken').pack(side='bottom', fill='x')
+        self.actualizar_estado()
+
+    def actualizar_estado(self):
+        """Refresca el resumen de llamadas y tiempos una vez por segundo."""
+        self.estado.set(instrumentacion.resumen())
+        self.master.after(1000, self.actualizar_estado)
+
     # --- Funcionalidad ---
 
     def validar_entradas(self):
@@ -150,29 +167,45 @@ class AmortizacionApp:
         
         # 1. Calcular la Tasa Efectiva Periódica
         try:
-            self.tasa_per = financiero.calcular_tasa_periodica(tasa, frecuencia, self.tipo_tasa.get())
+            tasa_per = financiero.calcular_tasa_periodica(tasa, frecuencia, self.tipo_tasa.get())
         except ValueError as e:
             messagebox.showerror("Error Financiero", str(e))
             return
             
         # 2. Calcular la Cuota Constante
-        self.cuota_original = financiero.calcular_cuota_constante(monto, self.tasa_per, plazo)
+        cuota_original = financiero.calcular_cuota_constante(monto, tasa_per, plazo)
 
-        # 3. Generar la Tabla
-        try:
-            self.tabla_amortizacion = financiero.generar_tabla_base(
-                monto, self.tasa_per, self.cuota_original, plazo, frecuencia, fecha_inicio_dt
-            )
+        # 3. Generar la Tabla en segundo plano (filas como tuplas: la fecha se formatea al mostrarla)
+        modo_fechas = CALENDARIOS[self.calendario_nombre.get()]
+
+        def calcular(control):
+            tabla = TablaAmortizacion()
+            filas = financiero.iterar_valores_base(monto, tasa_per, cuota_original, plazo, frecuencia, fecha_inicio_dt,
+                                                   modo_fechas=modo_fechas)
+            for valores in control.recorrer(filas, plazo):
+                tabla.agregar(*valores)
+            return tabla
+
+        def al_terminar(tabla):
+            self.tasa_per = tasa_per
+            self.cuota_original = cuota_original
+            self.tabla_amortizacion = tabla
             self.actualizar_treeview()
             messagebox.showinfo("Éxito", f"Tabla generada.\nCuota constante: ${self.cuota_original:,.2f}\nTasa periódica: {self.tasa_per*100:,.4f}%")
-        except Exception as e:
+
+        def al_error(e):
             messagebox.showerror("Error de Cálculo", f"Ocurrió un error al generar la tabla: {e}")
 
+        self.iniciar_tarea('generar', calcular, al_terminar, al_error)
+
     def aplicar_abono(self):
         """Aplica el abono y llama a la función de re-cálculo."""
         if not self.tabla_amortizacion:
             messagebox.showwarning("Advertencia", "Primero genere la tabla de amortización.")
             return
+        if self.trabajador.ocupado:
+            messagebox.showwarning("Advertencia", "Espere a que termine el cálculo en curso o cancélelo.")
+            return
             
         try:
             periodo = int(self.abono_periodo.get())
@@ -184,51 +217,44 @@ class AmortizacionApp:
 
             plazo_original = self.plazo.get()
             frecuencia = FRECUENCIAS_ANUALES[self.frecuencia_nombre.get()]
+        except Exception as e:
+            messagebox.showerror("Error al Aplicar Abono", f"Error: {e}")
+            return
 
-            self.tabla_amortizacion = financiero.aplicar_abono_y_recalcular(
-                self.tabla_amortizacion, periodo, monto, opcion, self.tasa_per, plazo_original, frecuencia
+        # Se recalcula sobre una copia: la tabla visible no cambia hasta tener el resultado
+        tabla = self.tabla_amortizacion[:]
+        tasa_per = self.tasa_per
+
+        # El re-cálculo original es un solo bloque (su resultado es el de los CSV de referencia):
+        # no informa avance, así que la barra queda indeterminada; Cancelar descarta el resultado
+        def calcular(control):
+            control.verificar()
+            return financiero.aplicar_abono_y_recalcular(
+                tabla, periodo, monto, opcion, tasa_per, plazo_original, frecuencia
             )
-            self.actualizar_treeview()
+
+        def al_terminar(tabla_nueva):
+            self.tabla_amortizacion = tabla_nueva
+            self.actualizar_treeview(desde_periodo=periodo)
             messagebox.showinfo("Abono Aplicado", f"Abono de ${monto:,.2f} aplicado en período {periodo}. Tabla recalculada para reducir {opcion.lower()}.")
 
-        except Exception as e:
+        def al_error(e):
             messagebox.showerror("Error al Aplicar Abono", f"Error: {e}")
 
-    def actualizar_treeview(self):
-        """Limpia el Treeview y lo llena con los datos de la tabla."""
-        # Limpiar entradas previas
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-        
-        # Insertar nuevas filas
-        for fila in self.tabla_amortizacion:
-            # Resaltar la fila de abono o la fila de re-cálculo
-            tags = ()
-            if fila.get('abono_adhoc', 0.0) > 0.0:
-                tags = ('abono',)
-            elif fila.get('recalculado', False) and fila['periodo'] > 1:
-                tags = ('recalculado',)
-                
-            values = [f"{fila['periodo']:}", 
-                      fila['fecha'],
-                      f"{fila['saldo_inicial']:,.2f}",
-                      f"{fila['interes']:,.2f}",
-                      f"{fila['cuota_pagada']:,.2f}",
-                      f"{fila['amortizacion']:,.2f}",
-                      f"{fila['abono_adhoc']:,.2f}",
-                      f"{fila['saldo_final']:,.2f}"]
-                      
-            self.tree.insert('', tk.END, values=values, tags=tags)
-
-        # Configurar tags de estilo (ttk)
-        self.tree.tag_configure('abono', background='#e0ffff', font=('Arial', 9, 'bold')) # Azul claro para abono
-        self.tree.tag_configure('recalculado', background='#fffacd') # Amarillo claro para filas recalculadas
+        self.iniciar_tarea('abono', calcular, al_terminar, al_error, con_avance=False)
+
+    def actualizar_treeview(self, desde_periodo: int = None):
+        """Refresca la tabla visible; con desde_periodo solo cambian las filas recalculadas."""
+        self.vista_tabla.mostrar(self.tabla_amortizacion, desde_periodo)
 
     def exportar_csv(self):
         """Permite al usuario elegir la ubicación y exporta la tabla."""
         if not self.tabla_amortizacion:
             messagebox.showwarning("Advertencia", "Primero genere la tabla de amortización para exportar.")
             return
+        if self.trabajador.ocupado:
+            messagebox.showwarning("Advertencia", "Espere a que termine el cálculo en curso o cancélelo.")
+            return
             
         file_path = filedialog.asksaveasfilename(
             defaultextension=".csv",
@@ -236,12 +262,59 @@ class AmortizacionApp:
         )
         
         if file_path:
-            try:
-                mensaje = financiero.exportar_tabla_csv(self.tabla_amortizacion, file_path)
+            tabla = self.tabla_amortizacion
+
+            def exportar(control):
+                try:
+                    return financiero.exportar_tabla_csv(control.recorrer(tabla, len(tabla)), file_path)
+                except Cancelado:
+                    # No dejar un archivo a medias
+                    os.remove(file_path)
+                    raise
+
+            def al_terminar(mensaje):
                 messagebox.showinfo("Exportación Exitosa", mensaje)
-            except Exception as e:
+
+            def al_error(e):
                 messagebox.showerror("Error de Exportación", f"No se pudo exportar el archivo: {e}")
 
+            self.iniciar_tarea('exportar', exportar, al_terminar, al_error)
+
+    # --- Tareas en segundo plano ---
+
+    def iniciar_tarea(self, nombre, funcion, al_terminar, al_error, con_avance=True):
+        """Ejecuta la función en segundo plano mostrando el progreso y habilitando Cancelar.
+
+        Si la tarea no informa su avance (con_avance=False), la barra queda en modo indeterminado.
+        """
+        self.trabajador.cancelar()
+        self.tarea_actual = nombre
+        self.barra_progreso['value'] = 0
+        if not con_avance:
+            self.barra_progreso.configure(mode='indeterminate')
+            self.barra_progreso.start(15)
+        self.btn_cancelar.configure(state='normal')
+        self.trabajador.ejecutar(
+            funcion, al_terminar, al_error,
+            al_progreso=lambda porcentaje: self.barra_progreso.configure(value=porcentaje),
+            al_finalizar=self.tarea_finalizada
+        )
+
+    def tarea_finalizada(self):
+        self.tarea_actual = None
+        self.barra_progreso.stop()
+        self.barra_progreso.configure(mode='determinate')
+        self.barra_progreso['value'] = 0
+        self.btn_cancelar.configure(state='disabled')
+
+    def cancelar_tarea(self):
+        self.trabajador.cancelar()
+
+    def parametros_modificados(self, *args):
+        """Si cambian los parámetros mientras se genera la tabla, ese resultado ya no sirve."""
+        if self.tarea_actual == 'generar':
+            self.trabajador.invalidar()
+
 
 if __name__ == '__main__':
     root = tk.Tk()
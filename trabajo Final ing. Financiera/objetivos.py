@@ -0,0 +1,209 @@
+import numpy as np
+from typing import Tuple
+
+from cartera import generar_tablas_cartera
+from financiero import REDONDEO
+from vectorial import cuota_constante, redondear
+
+# Tolerancia y límite de iteraciones por defecto de los métodos de Newton
+TOLERANCIA = 1e-12
+MAX_ITERACIONES = 60
+
+
+def _newton_acotado(funcion, bajo: np.ndarray, alto: np.ndarray, inicial: np.ndarray,
+                    tolerancia: float, max_iteraciones: int) -> Tuple[np.ndarray, int]:
+    """Newton vectorizado con respaldo de bisección dentro del intervalo [bajo, alto].
+
+    `funcion(x)` devuelve (f(x), f'(x)) y se asume f(bajo) < 0 < f(alto) en cada elemento.
+    Si el paso de Newton sale del intervalo se toma el punto medio, así la convergencia
+    está garantizada y suele tomar pocas iteraciones.
+    """
+    x = np.clip(inicial, bajo, alto)
+    bajo, alto = bajo.copy(), alto.copy()
+    for iteracion in range(1, max_iteraciones + 1):
+        valor, derivada = funcion(x)
+        negativo = valor < 0
+        bajo = np.where(negativo, x, bajo)
+        alto = np.where(negativo, alto, x)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            candidato = x - valor / derivada
+        fuera = ~np.isfinite(candidato) | (candidato <= bajo) | (candidato >= alto)
+        nuevo = np.where(fuera, (bajo + alto) / 2, candidato)
+        if np.all(np.abs(nuevo - x) <= tolerancia * np.maximum(1.0, np.abs(x))):
+            return nuevo, iteracion
+        x = nuevo
+    return x, max_iteraciones
+
+
+# --- Tasa ---
+
+def tasa_periodica_para_cuota(principales, cuotas, n_periodos, tolerancia: float = TOLERANCIA,
+                              max_iteraciones: int = MAX_ITERACIONES) -> np.ndarray:
+    """Tasa periódica con la que la cuota constante de cada préstamo es la indicada.
+
+    Devuelve NaN donde no existe tasa no negativa (cuota * n < principal).
+    """
+    principales, cuotas, n_periodos = (np.atleast_1d(a).astype(float) for a in np.broadcast_arrays(principales, cuotas, n_periodos))
+    sin_solucion = cuotas * n_periodos < principales
+
+    def funcion(i):
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            descuento = (1 + i) ** -n_periodos
+            a = 1 - descuento
+            cuota = np.where(i == 0, principales / n_periodos, principales * i / a)
+            derivada = principales * (a - i * n_periodos * descuento / (1 + i)) / a ** 2
+            derivada = np.where(i == 0, principales * (n_periodos + 1) / (2 * n_periodos), derivada)
+        return cuota - cuotas, derivada
+
+    # La cuota nunca es menor que el interés del primer período: i <= cuota / principal
+    bajo = np.zeros_like(principales)
+    alto = np.where(sin_solucion, 1.0, cuotas / principales)
+    # Aproximación inicial clásica de la tasa de una anualidad
+    inicial = np.maximum(2 * (cuotas * n_periodos - principales) / (principales * (n_periodos + 1)), 0.0)
+    tasa, _ = _newton_acotado(funcion, bajo, alto, inicial, tolerancia, max_iteraciones)
+    return np.where(sin_solucion, np.nan, tasa)
+
+
+def tasa_anual_desde_periodica(tasas_per, frecuencia_pago, tipo_tasa: str) -> np.ndarray:
+    """Inversa de financiero.calcular_tasa_periodica, vectorizada."""
+    tasas_per = np.asarray(tasas_per, dtype=float)
+    tipo_tasa = tipo_tasa.upper()
+    if tipo_tasa == 'EFECTIVA':
+        return (1 + tasas_per) ** frecuencia_pago - 1
+    if tipo_tasa == 'NOMINAL':
+        return tasas_per * frecuencia_pago
+    if tipo_tasa == 'ANTICIPADA':
+        return tasas_per / (1 + tasas_per) * frecuencia_pago
+    raise ValueError("Tipo de tasa no reconocido. Use: EFECTIVA, NOMINAL o ANTICIPADA.")
+
+
+def tasa_anual_para_cuota(principales, cuotas, n_periodos, frecuencia_pago, tipo_tasa: str) -> np.ndarray:
+    """Tasa anual (factor decimal, del tipo indicado) que produce la cuota dada."""
+    return tasa_anual_desde_periodica(tasa_periodica_para_cuota(principales, cuotas, n_periodos),
+                                      frecuencia_pago, tipo_tasa)
+
+
+# --- Plazo ---
+
+def plazo_para_cuota(principales, tasas_per, cuotas, max_ajustes: int = 10) -> np.ndarray:
+    """Menor número de períodos con el que la cuota constante no supera la cuota dada.
+
+    Tiene solución cerrada (logaritmos); luego se ajusta con bisección entera comparando
+    con la cuota redondeada. Devuelve -1 donde la cuota no cubre el interés.
+    """
+    principales, tasas_per, cuotas = (np.atleast_1d(a).astype(float) for a in np.broadcast_arrays(principales, tasas_per, cuotas))
+    sin_solucion = cuotas <= principales * tasas_per
+    with np.errstate(divide='ignore', invalid='ignore'):
+        exacto = np.where(tasas_per == 0, principales / cuotas,
+                          -np.log1p(-principales * tasas_per / cuotas) / np.log1p(tasas_per))
+    n = np.where(sin_solucion | ~np.isfinite(exacto), 1, np.maximum(np.ceil(exacto - 1e-9), 1)).astype(np.int64)
+
+    for _ in range(max_ajustes):
+        excede = ~sin_solucion & (cuota_constante(principales, tasas_per, n) > cuotas)
+        if not excede.any():
+            break
+        n = np.where(excede, n + 1, n)
+
+    # Con plazos largos muchos plazos seguidos pueden dar la misma cuota al centavo:
+    # se busca el menor plazo válido en (bajo, n] sabiendo que la cuota no crece con el plazo
+    bajo = np.zeros_like(n)
+    while np.any(n - bajo > 1):
+        medio = (bajo + n) // 2
+        abierto = n - bajo > 1
+        valido = cuota_constante(principales, tasas_per, np.maximum(medio, 1)) <= cuotas
+        n = np.where(abierto & valido, medio, n)
+        bajo = np.where(abierto & ~valido, medio, bajo)
+    return np.where(sin_solucion, -1, n)
+
+
+# --- TIR / costo efectivo ---
+
+def tir(flujos, tolerancia: float = TOLERANCIA, max_iteraciones: int = MAX_ITERACIONES) -> np.ndarray:
+    """Tasa interna de retorno periódica de cada fila de `flujos` (préstamos x períodos).
+
+    La columna 0 es el desembolso (negativo) y las siguientes los pagos de cada período.
+    """
+    flujos = np.atleast_2d(np.asarray(flujos, dtype=float))
+    t = np.arange(flujos.shape[1])
+
+    def funcion(i):
+        # VPN decreciente en i: se usa -VPN para que la función sea creciente
+        with np.errstate(over='ignore', invalid='ignore'):
+            descuento = (1 + i[:, None]) ** -t
+            vpn = (flujos * descuento).sum(axis=1)
+            derivada = (-t * flujos * descuento / (1 + i[:, None])).sum(axis=1)
+        return -vpn, -derivada
+
+    pagos = flujos[:, 1:].sum(axis=1)
+    desembolso = -flujos[:, 0]
+    bajo = np.full(flujos.shape[0], -0.99)
+    alto = np.full(flujos.shape[0], 10.0)
+    n = np.maximum((flujos[:, 1:] != 0).sum(axis=1), 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inicial = 2 * (pagos - desembolso) / (desembolso * (n + 1))
+    inicial = np.where(np.isfinite(inicial), inicial, 0.0)
+    tasa, _ = _newton_acotado(funcion, bajo, alto, inicial, tolerancia, max_iteraciones)
+    return tasa
+
+
+def costo_efectivo_anual(tablas, principales, frecuencia_pago) -> np.ndarray:
+    """Costo efectivo anual (TIR anualizada) de las tablas de generar_tablas_cartera.
+
+    `tablas` también puede ser una TablaAmortizacion; en ese caso se suman sus abonos.
+    """
+    if isinstance(tablas, dict):
+        pagos = np.where(tablas['activo'], tablas['cuota_pagada'], 0.0)
+    else:
+        pagos = (np.frombuffer(tablas.columna('cuota_pagada'), dtype=float)
+                 + np.frombuffer(tablas.columna('abono_adhoc'), dtype=float))[None, :]
+    flujos = np.column_stack([-np.atleast_1d(np.asarray(principales, dtype=float)), pagos])
+    return (1 + tir(flujos)) ** np.asarray(frecuencia_pago) - 1
+
+
+# --- Abono requerido ---
+
+def abono_para_cuota(saldos, tasas_per, n_restantes, cuotas_objetivo, max_ajustes: int = 10) -> np.ndarray:
+    """Abono mínimo (al centavo) para que la cuota recalculada no supere la cuota objetivo.
+
+    `saldos` es el saldo al cierre del período del abono y `n_restantes` los períodos que
+    faltan; la cuota nueva se calcula como en la opción CUOTA (calcular_cuota_constante).
+    Si hay que saldar el crédito, el abono es el saldo completo.
+    """
+    saldos, tasas_per, n_restantes, cuotas_objetivo = (
+        np.atleast_1d(a).astype(float) for a in np.broadcast_arrays(saldos, tasas_per, n_restantes, cuotas_objetivo))
+    escala = 10.0 ** REDONDEO
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factor = np.where(tasas_per == 0, 1 / n_restantes, tasas_per / (1 - (1 + tasas_per) ** -n_restantes))
+        # La cuota es lineal en el saldo; se admite hasta medio centavo por el redondeo final
+        saldo_maximo = (cuotas_objetivo + 0.5 / escala) / factor
+    abono = np.clip(np.ceil((saldos - saldo_maximo) * escala) / escala, 0.0, saldos)
+
+    # Ajuste al centavo exacto contra la cuota redondeada
+    for _ in range(max_ajustes):
+        excede = (abono < saldos) & (cuota_constante(saldos - abono, tasas_per, n_restantes) > cuotas_objetivo)
+        if not excede.any():
+            break
+        abono = np.where(excede, np.minimum(abono + 1 / escala, saldos), abono)
+    for _ in range(max_ajustes):
+        menor = np.maximum(abono - 1 / escala, 0.0)
+        sobra = (abono > 0) & (cuota_constante(saldos - menor, tasas_per, n_restantes) <= cuotas_objetivo)
+        if not sobra.any():
+            break
+        abono = np.where(sobra, menor, abono)
+    return redondear(abono)
+
+
+def abono_para_cuota_cartera(principales, tasas_per, cuotas, n_periodos, periodos_abono, cuotas_objetivo) -> np.ndarray:
+    """Abono en el período k de cada préstamo para bajar su cuota a la objetivo.
+
+    Obtiene el saldo exacto al cierre del período k con generar_tablas_cartera.
+    """
+    tablas = generar_tablas_cartera(principales, tasas_per, cuotas, n_periodos)
+    periodos_abono = np.atleast_1d(np.asarray(periodos_abono, dtype=np.int64))
+    periodos_abono = np.broadcast_to(periodos_abono, tablas['n_periodos'].shape)
+    if np.any(periodos_abono < 1) or np.any(periodos_abono >= tablas['n_periodos']):
+        raise IndexError("El período de abono debe ser anterior al plazo de cada préstamo.")
+    filas = np.arange(len(periodos_abono))
+    saldos = tablas['saldo_final'][filas, periodos_abono - 1]
+    tasas = np.broadcast_to(np.asarray(tasas_per, dtype=float), saldos.shape)
+    return abono_para_cuota(saldos, tasas, tablas['n_periodos'] - periodos_abono, cuotas_objetivo)
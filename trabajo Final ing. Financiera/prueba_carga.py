@@ -0,0 +1,177 @@
+"""Prueba de carga del servicio de amortización (servicio.py).
+
+Uso:
+    python prueba_carga.py --iniciar-servicio --conexiones 64 --solicitudes 20000
+    python prueba_carga.py --host 127.0.0.1 --puerto 8080 --ruta /tabla --distintos 2000
+
+Abre varias conexiones keep-alive y envía créditos elegidos al azar de un conjunto de
+`--distintos` variantes (así se ejercitan la caché y la fusión de solicitudes). Informa
+solicitudes por segundo, latencias p50/p95/p99/máxima y el origen de cada respuesta
+(cabecera X-Cache). Con --iniciar-servicio levanta servicio.py en otro proceso.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+from collections import Counter
+from typing import Dict, List
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+def generar_creditos(distintos: int, semilla: int = 7) -> List[bytes]:
+    """Cuerpos JSON de `distintos` créditos con parámetros variados."""
+    azar = random.Random(semilla)
+    frecuencias = [12, 24, 4, 52, 1]
+    creditos = []
+    for numero in range(distintos):
+        plazo = azar.choice([12, 24, 36, 60, 120, 240, 360])
+        credito = {
+            'id': numero,
+            'monto': azar.randrange(1, 500) * 1000000,
+            'tasa': round(azar.uniform(5, 35), 2),
+            'plazo': plazo,
+            'frecuencia': azar.choice(frecuencias),
+            'tipo_tasa': azar.choice(['NOMINAL', 'EFECTIVA', 'ANTICIPADA']),
+            'fecha_inicio': '2025-01-01',
+        }
+        if azar.random() < 0.3:
+            credito['abonos'] = f"{max(1, plazo // 3)}:{credito['monto'] // 10}:{azar.choice(['PLAZO', 'CUOTA'])}"
+        creditos.append(json.dumps(credito).encode('utf-8'))
+    return creditos
+
+
+def percentil(valores: List[float], p: float) -> float:
+    """Percentil por rango más cercano de una lista ya ordenada."""
+    if not valores:
+        return 0.0
+    k = max(0, min(len(valores) - 1, int(round(p / 100 * len(valores) + 0.5)) - 1))
+    return valores[k]
+
+
+async def _cliente(host: str, puerto: int, ruta: str, cuerpos: List[bytes], restantes: List[int],
+                   latencias: List[float], estados: Counter, origenes: Counter, azar: random.Random):
+    """Una conexión keep-alive que envía solicitudes mientras queden."""
+    lector, escritor = await asyncio.open_connection(host, puerto, limit=1 << 24)
+    try:
+        while restantes[0] > 0:
+            restantes[0] -= 1
+            cuerpo = azar.choice(cuerpos)
+            solicitud = (f"POST {ruta} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                         f"Content-Length: {len(cuerpo)}\r\n\r\n").encode('latin-1') + cuerpo
+            inicio = time.perf_counter()
+            escritor.write(solicitud)
+            await escritor.drain()
+            cabecera = await lector.readuntil(b'\r\n\r\n')
+            lineas = cabecera.decode('latin-1').split('\r\n')
+            cabeceras = {}
+            for texto in lineas[1:]:
+                nombre, _, valor = texto.partition(':')
+                cabeceras[nombre.strip().lower()] = valor.strip()
+            await lector.readexactly(int(cabeceras.get('content-length') or 0))
+            latencias.append(time.perf_counter() - inicio)
+            estados[int(lineas[0].split(' ', 2)[1])] += 1
+            origenes[cabeceras.get('x-cache', '-')] += 1
+            if cabeceras.get('connection', '').lower() == 'close':
+                break
+    finally:
+        escritor.close()
+
+
+async def ejecutar(host: str, puerto: int, ruta: str, conexiones: int, solicitudes: int, distintos: int) -> Dict:
+    cuerpos = generar_creditos(distintos)
+    latencias: List[float] = []
+    estados: Counter = Counter()
+    origenes: Counter = Counter()
+    restantes = [solicitudes]
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_cliente(host, puerto, ruta, cuerpos, restantes, latencias, estados, origenes,
+                                    random.Random(n)) for n in range(conexiones)))
+    segundos = time.perf_counter() - inicio
+    latencias.sort()
+    return {
+        'solicitudes': len(latencias),
+        'segundos': segundos,
+        'solicitudes_por_segundo': len(latencias) / segundos if segundos > 0 else 0.0,
+        'p50_ms': percentil(latencias, 50) * 1000,
+        'p95_ms': percentil(latencias, 95) * 1000,
+        'p99_ms': percentil(latencias, 99) * 1000,
+        'max_ms': (latencias[-1] if latencias else 0.0) * 1000,
+        'estados': dict(estados),
+        'origenes': dict(origenes),
+    }
+
+
+async def _esperar_servicio(host: str, puerto: int, limite_s: float = 30.0):
+    """Espera a que el servicio acepte conexiones."""
+    fin = time.monotonic() + limite_s
+    while True:
+        try:
+            _, escritor = await asyncio.open_connection(host, puerto)
+            escritor.close()
+            return
+        except OSError:
+            if time.monotonic() > fin:
+                raise
+            await asyncio.sleep(0.1)
+
+
+def _detener_servicio(proceso: subprocess.Popen, limite_s: float = 10.0):
+    """Detiene el servicio con SIGINT para que cierre sus procesos de cálculo; si no responde, lo mata."""
+    if os.name == 'nt':
+        proceso.terminate()
+    else:
+        proceso.send_signal(signal.SIGINT)
+    try:
+        proceso.wait(timeout=limite_s)
+    except subprocess.TimeoutExpired:
+        proceso.kill()
+        proceso.wait()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio de amortización.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8080)
+    parser.add_argument('--ruta', default='/resumen', choices=['/resumen', '/tabla'])
+    parser.add_argument('--conexiones', type=int, default=64, help="Conexiones simultáneas.")
+    parser.add_argument('--solicitudes', type=int, default=10000, help="Total de solicitudes.")
+    parser.add_argument('--distintos', type=int, default=1000, help="Créditos distintos entre los que se elige.")
+    parser.add_argument('--iniciar-servicio', action='store_true', help="Levantar servicio.py en otro proceso.")
+    parser.add_argument('--trabajadores', type=int, default=None, help="Procesos del servicio (con --iniciar-servicio).")
+    parser.add_argument('--json', help="Guardar el resultado en este archivo JSON.")
+    args = parser.parse_args(argv)
+
+    proceso = None
+    if args.iniciar_servicio:
+        comando = [sys.executable, os.path.join(DIRECTORIO, 'servicio.py'), '--host', args.host, '--puerto', str(args.puerto)]
+        if args.trabajadores:
+            comando += ['--trabajadores', str(args.trabajadores)]
+        proceso = subprocess.Popen(comando, cwd=DIRECTORIO)
+    try:
+        if proceso is not None:
+            asyncio.run(_esperar_servicio(args.host, args.puerto))
+        resultado = asyncio.run(ejecutar(args.host, args.puerto, args.ruta, args.conexiones,
+                                         args.solicitudes, args.distintos))
+    finally:
+        if proceso is not None:
+            _detener_servicio(proceso)
+
+    print(f"{resultado['solicitudes']} solicitudes en {resultado['segundos']:.2f} s: "
+          f"{resultado['solicitudes_por_segundo']:,.0f} solicitudes/s")
+    print(f"latencia p50 {resultado['p50_ms']:.2f} ms | p95 {resultado['p95_ms']:.2f} ms | "
+          f"p99 {resultado['p99_ms']:.2f} ms | máx {resultado['max_ms']:.2f} ms")
+    print(f"estados {resultado['estados']} | origen {resultado['origenes']}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as archivo:
+            json.dump(resultado, archivo, indent=2, ensure_ascii=False)
+    return 0 if set(resultado['estados']) <= {200} else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""Servicio HTTP/JSON local del motor de amortización (solo biblioteca estándar).
+
+Uso:
+    python servicio.py --puerto 8080 --trabajadores 4
+
+Rutas:
+    POST /tabla     cuerpo: un crédito en JSON (mismos campos que lote.py); devuelve el
+                    resumen y la tabla completa ("columnas" y "filas")
+    POST /resumen   igual, pero solo el resumen
+    GET  /salud     estado del servicio y contadores de caché
+
+El cálculo corre en un grupo de procesos. Las solicitudes idénticas que llegan mientras
+una ya se está calculando esperan ese mismo resultado, y las respuestas se guardan en una
+caché LRU indexada por los parámetros normalizados del crédito (sin el id). La cabecera
+X-Cache indica el origen: HIT (caché), COALESCED (cálculo compartido) o MISS.
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, Optional, Tuple
+
+from calendario import formatear
+from lote import _resumir, calcular_prestamo, clave_prestamo, normalizar_prestamo
+from tabla import COLUMNAS
+
+TAMANO_CACHE = 4096                # Respuestas guardadas como máximo
+BYTES_CACHE = 256 * 1024 * 1024    # Memoria máxima de la caché de respuestas
+MAX_CUERPO = 1024 * 1024           # Tamaño máximo del cuerpo de una solicitud
+MAX_CABECERA = 64 * 1024
+
+_RAZONES = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 422: 'Unprocessable Entity', 431: 'Request Header Fields Too Large',
+            500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class Saturado(Exception):
+    """Hay demasiados cálculos distintos en curso; el cliente debe reintentar."""
+
+
+class SolicitudInvalida(ValueError):
+    """El cuerpo no es un crédito válido."""
+
+
+def _calcular_respuesta(prestamo: Dict, solo_resumen: bool) -> bytes:
+    """Trabajo de cada proceso: calcula el crédito y serializa la respuesta JSON."""
+    tabla = calcular_prestamo(prestamo)
+    resumen = _resumir(prestamo, tabla)
+    del resumen['id'], resumen['error']
+    cuerpo = {'resumen': resumen}
+    if not solo_resumen:
+        columnas = [tabla.columna(col) for col in COLUMNAS]
+        columnas[1] = map(formatear, columnas[1])
+        columnas[9] = map(bool, columnas[9])
+        cuerpo['columnas'] = COLUMNAS
+        cuerpo['filas'] = list(zip(*columnas))
+    return json.dumps(cuerpo, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _clave(prestamo: Dict, solo_resumen: bool) -> str:
+    """Clave de caché: parámetros normalizados del crédito, sin su id, y el tipo de respuesta."""
+    return f"{'resumen' if solo_resumen else 'tabla'}:{clave_prestamo(prestamo)}"
+
+
+class ServicioAmortizacion:
+    """Calcula tablas en un grupo de procesos, fusiona solicitudes iguales y guarda respuestas."""
+
+    def __init__(self, trabajadores: Optional[int] = None, tamano_cache: int = TAMANO_CACHE,
+                 bytes_cache: int = BYTES_CACHE, max_pendientes: Optional[int] = None):
+        self.trabajadores = trabajadores or os.cpu_count() or 1
+        self.tamano_cache = tamano_cache
+        self.bytes_cache = bytes_cache
+        # Más cálculos distintos en espera solo alargan la cola: se rechazan con 503
+        self.max_pendientes = max_pendientes or 64 * self.trabajadores
+        self._ejecutor: Optional[ProcessPoolExecutor] = None
+        self._servidor: Optional[asyncio.AbstractServer] = None
+        self._cache: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._bytes = 0
+        self._en_curso: Dict[str, asyncio.Future] = {}
+        self._contadores = dict.fromkeys(
+            ('solicitudes', 'aciertos_cache', 'fusionadas', 'calculadas', 'rechazadas', 'errores'), 0)
+
+    # --- Ciclo de vida ---
+
+    async def iniciar(self, host: str = '127.0.0.1', puerto: int = 8080) -> asyncio.AbstractServer:
+        self._ejecutor = ProcessPoolExecutor(max_workers=self.trabajadores)
+        # Arrancar los procesos antes de la primera solicitud
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._ejecutor, os.getpid) for _ in range(self.trabajadores)))
+        self._servidor = await asyncio.start_server(self._atender, host, puerto, limit=MAX_CABECERA)
+        return self._servidor
+
+    async def cerrar(self):
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+        if self._ejecutor is not None:
+            self._ejecutor.shutdown(cancel_futures=True)
+
+    # --- Cálculo con caché y fusión de solicitudes ---
+
+    async def calcular(self, registro: Dict, solo_resumen: bool = False) -> Tuple[bytes, str]:
+        """Devuelve (cuerpo JSON, origen) para un registro de crédito.
+
+        Lanza SolicitudInvalida si el registro no es válido, Saturado si hay demasiados
+        cálculos en curso, o la excepción del motor si el cálculo falla.
+        """
+        self._contadores['solicitudes'] += 1
+        try:
+            prestamo = normalizar_prestamo(registro, 0)
+        except KeyError as e:
+            raise SolicitudInvalida(f"Falta el campo {e}.") from e
+        except (ValueError, TypeError) as e:
+            raise SolicitudInvalida(str(e)) from e
+        clave = _clave(prestamo, solo_resumen)
+
+        cuerpo = self._cache.get(clave)
+        if cuerpo is not None:
+            self._cache.move_to_end(clave)
+            self._contadores['aciertos_cache'] += 1
+            return cuerpo, 'HIT'
+
+        futuro = self._en_curso.get(clave)
+        if futuro is not None:
+            self._contadores['fusionadas'] += 1
+            return await asyncio.shield(futuro), 'COALESCED'
+
+        if len(self._en_curso) >= self.max_pendientes:
+            self._contadores['rechazadas'] += 1
+            raise Saturado()
+        futuro = asyncio.get_running_loop().run_in_executor(self._ejecutor, _calcular_respuesta, prestamo, solo_resumen)
+        self._en_curso[clave] = futuro
+        futuro.add_done_callback(partial(self._al_terminar, clave))
+        self._contadores['calculadas'] += 1
+        # shield: si el cliente se desconecta, el cálculo sigue para las solicitudes fusionadas
+        return await asyncio.shield(futuro), 'MISS'
+
+    def _al_terminar(self, clave: str, futuro: asyncio.Future):
+        self._en_curso.pop(clave, None)
+        if futuro.cancelled() or futuro.exception() is not None:
+            return
+        cuerpo = futuro.result()
+        if len(cuerpo) > self.bytes_cache:
+            return
+        self._cache[clave] = cuerpo
+        self._bytes += len(cuerpo)
+        while len(self._cache) > self.tamano_cache or self._bytes > self.bytes_cache:
+            _, viejo = self._cache.popitem(last=False)
+            self._bytes -= len(viejo)
+
+    def estadisticas(self) -> Dict:
+        datos = dict(self._contadores)
+        datos.update({
+            'en_curso': len(self._en_curso),
+            'respuestas_en_cache': len(self._cache),
+            'bytes_en_cache': self._bytes,
+            'trabajadores': self.trabajadores,
+        })
+        return datos
+
+    # --- HTTP ---
+
+    async def _despachar(self, metodo: str, ruta: str, cuerpo: bytes) -> Tuple[int, bytes, str]:
+        """Resuelve una solicitud: (estado, cuerpo JSON, origen para X-Cache)."""
+        ruta = ruta.split('?', 1)[0]
+        if ruta == '/salud':
+            if metodo != 'GET':
+                return 405, _error("Use GET."), ''
+            return 200, json.dumps({'estado': 'ok', **self.estadisticas()}).encode('utf-8'), ''
+        if ruta not in ('/tabla', '/resumen'):
+            return 404, _error(f"Ruta no encontrada: {ruta}"), ''
+        if metodo != 'POST':
+            return 405, _error("Use POST con un crédito en JSON."), ''
+
+        try:
+            registro = json.loads(cuerpo)
+            if not isinstance(registro, dict):
+                raise SolicitudInvalida("El cuerpo debe ser un objeto JSON con los datos del crédito.")
+            respuesta, origen = await self.calcular(registro, solo_resumen=(ruta == '/resumen'))
+            return 200, respuesta, origen
+        except Saturado:
+            return 503, _error("Servicio saturado; reintente en un momento."), ''
+        except (SolicitudInvalida, json.JSONDecodeError, UnicodeDecodeError) as e:
+            self._contadores['errores'] += 1
+            return 400, _error(str(e)), ''
+        except (ValueError, IndexError) as e:
+            # Parámetros válidos que el motor no puede calcular (ej. abono fuera del plazo)
+            self._contadores['errores'] += 1
+            return 422, _error(str(e)), ''
+        except Exception as e:
+            self._contadores['errores'] += 1
+            return 500, _error(f"Error interno: {e}"), ''
+
+    async def _atender(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        """Atiende una conexión HTTP/1.1 (con keep-alive) hasta que el cliente la cierre."""
+        try:
+            while True:
+                try:
+                    cabecera = await lector.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    escritor.write(_respuesta(431, _error("Cabecera demasiado grande."), False))
+                    break
+
+                linea, *lineas = cabecera.decode('latin-1').rstrip('\r\n').split('\r\n')
+                try:
+                    metodo, ruta, version = linea.split(' ', 2)
+                except ValueError:
+                    escritor.write(_respuesta(400, _error("Solicitud HTTP mal formada."), False))
+                    break
+                cabeceras = {}
+                for texto in lineas:
+                    nombre, _, valor = texto.partition(':')
+                    cabeceras[nombre.strip().lower()] = valor.strip()
+                mantener = version == 'HTTP/1.1' and cabeceras.get('connection', '').lower() != 'close'
+
+                largo = _largo_cuerpo(cabeceras.get('content-length', '0'))
+                if largo is None:
+                    escritor.write(_respuesta(400, _error("Content-Length inválido."), False))
+                    break
+                if largo > MAX_CUERPO:
+                    escritor.write(_respuesta(413, _error("Cuerpo demasiado grande."), False))
+                    break
+                cuerpo = await lector.readexactly(largo) if largo else b''
+
+                estado, datos, origen = await self._despachar(metodo.upper(), ruta, cuerpo)
+                escritor.write(_respuesta(estado, datos, mantener, origen))
+                await escritor.drain()
+                if not mantener:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            escritor.close()
+
+
+def _largo_cuerpo(valor: str) -> Optional[int]:
+    """Valor de Content-Length; None si no es un entero decimal no negativo."""
+    if not (valor.isascii() and valor.isdigit()):
+        return None
+    return int(valor)
+
+
+def _error(mensaje: str) -> bytes:
+    return json.dumps({'error': mensaje}, ensure_ascii=False).encode('utf-8')
+
+
+def _respuesta(estado: int, cuerpo: bytes, mantener: bool, origen: str = '') -> bytes:
+    cabeceras = [
+        f"HTTP/1.1 {estado} {_RAZONES.get(estado, '')}",
+        "Content-Type: application/json; charset=utf-8",
+        f"Content-Length: {len(cuerpo)}",
+        f"Connection: {'keep-alive' if mantener else 'close'}",
+    ]
+    if origen:
+        cabeceras.append(f"X-Cache: {origen}")
+    if estado == 503:
+        cabeceras.append("Retry-After: 1")
+    return ("\r\n".join(cabeceras) + "\r\n\r\n").encode('latin-1') + cuerpo
+
+
+async def servir(host: str, puerto: int, trabajadores: Optional[int] = None, tamano_cache: int = TAMANO_CACHE):
+    """Inicia el servicio y atiende hasta recibir SIGINT o SIGTERM.
+
+    Al detenerse cierra el servidor y el grupo de procesos de cálculo, así no quedan
+    trabajadores huérfanos. En Windows, donde el bucle no admite manejadores de señales,
+    se detiene con Ctrl+C (KeyboardInterrupt).
+    """
+    servicio = ServicioAmortizacion(trabajadores, tamano_cache)
+    servidor = await servicio.iniciar(host, puerto)
+    detener = asyncio.Event()
+    bucle = asyncio.get_running_loop()
+    for senal in (signal.SIGINT, signal.SIGTERM):
+        try:
+            bucle.add_signal_handler(senal, detener.set)
+        except NotImplementedError:
+            pass
+    print(f"Servicio de amortización en http://{host}:{puerto} ({servicio.trabajadores} procesos)", flush=True)
+    try:
+        async with servidor:
+            await detener.wait()
+    finally:
+        await servicio.cerrar()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Servicio HTTP/JSON local del motor de amortización.")
+    parser.add_argument('--host', default='127.0.0.1', help="Dirección de escucha (por defecto, solo local).")
+    parser.add_argument('--puerto', type=int, default=8080)
+    parser.add_argument('--trabajadores', type=int, default=None, help="Procesos de cálculo (por defecto, núcleos disponibles).")
+    parser.add_argument('--cache', type=int, default=TAMANO_CACHE, help="Respuestas guardadas en la caché LRU.")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(servir(args.host, args.puerto, args.trabajadores, args.cache))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
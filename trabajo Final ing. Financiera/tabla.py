@@ -0,0 +1,139 @@
+from array import array
+from collections.abc import Mapping, MutableMapping, Sequence
+from datetime import date
+from typing import Iterable, Iterator, Union
+
+# Columnas de cada fila, en el mismo orden que usaban los diccionarios de la tabla.
+COLUMNAS = ('periodo', 'fecha', 'saldo_inicial', 'interes', 'cuota_original', 'cuota_pagada',
+            'amortizacion', 'abono_adhoc', 'saldo_final', 'recalculado')
+
+# Tipo de cada arreglo: enteros de 32 bits para período y fecha (ordinal), flotantes de
+# 64 bits para los montos y un byte para la marca de re-cálculo.
+_TIPOS = {
+    'periodo': 'i',
+    'fecha': 'i',
+    'saldo_inicial': 'd',
+    'interes': 'd',
+    'cuota_original': 'd',
+    'cuota_pagada': 'd',
+    'amortizacion': 'd',
+    'abono_adhoc': 'd',
+    'saldo_final': 'd',
+    'recalculado': 'b',
+}
+
+
+def _a_ordinal(fecha: Union[str, date, int]) -> int:
+    """Convierte una fecha (texto YYYY-MM-DD, date u ordinal) a su ordinal."""
+    if isinstance(fecha, str):
+        return date.fromisoformat(fecha).toordinal()
+    if isinstance(fecha, date):
+        return fecha.toordinal()
+    return int(fecha)
+
+
+class FilaTabla(MutableMapping):
+    """Vista tipo diccionario de una fila de la tabla; lee y escribe sobre las columnas."""
+
+    __slots__ = ('_tabla', '_idx')
+
+    def __init__(self, tabla: 'TablaAmortizacion', idx: int):
+        self._tabla = tabla
+        self._idx = idx
+
+    def __getitem__(self, clave):
+        valor = self._tabla._columnas[clave][self._idx]
+        if clave == 'fecha':
+            return date.fromordinal(valor).isoformat()
+        if clave == 'recalculado':
+            return bool(valor)
+        return valor
+
+    def __setitem__(self, clave, valor):
+        if clave not in _TIPOS:
+            raise KeyError(clave)
+        if clave == 'fecha':
+            valor = _a_ordinal(valor)
+        self._tabla._columnas[clave][self._idx] = valor
+
+    def __delitem__(self, clave):
+        raise TypeError("Las filas de la tabla tienen columnas fijas.")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(COLUMNAS)
+
+    def __len__(self) -> int:
+        return len(COLUMNAS)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class TablaAmortizacion(Sequence):
+    """Tabla de amortización columnar respaldada por arreglos tipados (array.array).
+
+    Cada fila ocupa unos 65 bytes en lugar de un diccionario de 10 claves; el acceso por
+    índice devuelve una `FilaTabla` que se comporta como el diccionario de antes.
+    """
+
+    __slots__ = ('_columnas',)
+
+    def __init__(self):
+        self._columnas = {col: array(tipo) for col, tipo in _TIPOS.items()}
+
+    @classmethod
+    def desde_filas(cls, filas: Iterable[Mapping]) -> 'TablaAmortizacion':
+        """Construye la tabla a partir de filas tipo diccionario."""
+        tabla = cls()
+        tabla.extend(filas)
+        return tabla
+
+    def agregar(self, periodo: int, fecha: int, saldo_inicial: float, interes: float,
+                cuota_original: float, cuota_pagada: float, amortizacion: float,
+                abono_adhoc: float, saldo_final: float, recalculado: bool):
+        """Agrega una fila a partir de sus valores (fecha como ordinal)."""
+        c = self._columnas
+        c['periodo'].append(periodo)
+        c['fecha'].append(fecha)
+        c['saldo_inicial'].append(saldo_inicial)
+        c['interes'].append(interes)
+        c['cuota_original'].append(cuota_original)
+        c['cuota_pagada'].append(cuota_pagada)
+        c['amortizacion'].append(amortizacion)
+        c['abono_adhoc'].append(abono_adhoc)
+        c['saldo_final'].append(saldo_final)
+        c['recalculado'].append(recalculado)
+
+    def append(self, fila: Mapping):
+        """Agrega una fila tipo diccionario (compatible con la interfaz de List[Dict])."""
+        self.agregar(*(_a_ordinal(fila[col]) if col == 'fecha' else fila[col] for col in COLUMNAS))
+
+    def extend(self, filas: Iterable[Mapping]):
+        for fila in filas:
+            self.append(fila)
+
+    def columna(self, nombre: str) -> array:
+        """Devuelve el arreglo tipado de una columna (la fecha como ordinal)."""
+        return self._columnas[nombre]
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            nueva = TablaAmortizacion()
+            nueva._columnas = {col: arr[idx] for col, arr in self._columnas.items()}
+            return nueva
+        n = len(self)
+        if idx < 0:
+            idx += n
+        if not 0 <= idx < n:
+            raise IndexError("Índice de fila fuera de rango.")
+        return FilaTabla(self, idx)
+
+    def __len__(self) -> int:
+        return len(self._columnas['periodo'])
+
+    def __iter__(self) -> Iterator[FilaTabla]:
+        for idx in range(len(self)):
+            yield FilaTabla(self, idx)
+
+    def __repr__(self) -> str:
+        return f"<TablaAmortizacion filas={len(self)}>"
@@ -0,0 +1,201 @@
+from array import array
+from collections.abc import Sequence
+from datetime import date
+from typing import Dict, Iterator
+
+import calendario
+from calendario import MODO_DIAS
+from financiero import (CERO_FINANCIERO, REDONDEO, calcular_cuota_constante,
+                        calcular_tasa_periodica)
+from tabla import TablaAmortizacion
+
+
+class TablaPerezosa(Sequence):
+    """Tabla de amortización perezosa: responde consultas puntuales sin construir las filas.
+
+    `saldo_en(k, exacto=False)` usa la fórmula cerrada de la anualidad (O(1)). Con
+    `exacto=True` se le suma la corrección por el redondeo a centavos de cada interés,
+    que se obtiene avanzando sobre el saldo redondeado desde el punto de control más
+    cercano (uno cada `paso_control` períodos, calculados a medida que se necesitan).
+    Los valores exactos coinciden con los de `financiero.generar_tabla_base`.
+    """
+
+    def __init__(self, principal: float, tasa_per: float, cuota: float, n_periodos: int,
+                 frecuencia_pago: int, fecha_inicio: date, paso_control: int = 64,
+                 modo_fechas: str = MODO_DIAS):
+        if n_periodos <= 0:
+            raise ValueError("El número de períodos debe ser positivo.")
+        self.principal = principal
+        self.tasa_per = tasa_per
+        self.cuota = cuota
+        self.n_periodos = n_periodos
+        self.frecuencia_pago = frecuencia_pago
+        self.fecha_inicio = fecha_inicio
+        self.paso_control = paso_control
+        self.modo_fechas = modo_fechas
+        # _controles[j] es el saldo exacto al cierre del período j * paso_control
+        self._controles = array('d', [principal])
+
+    @classmethod
+    def desde_parametros(cls, principal: float, tasa_anual: float, frecuencia_pago: int, tipo_tasa: str,
+                         n_periodos: int, fecha_inicio: date, modo_fechas: str = MODO_DIAS) -> 'TablaPerezosa':
+        """Crea la tabla a partir de la tasa anual, igual que la interfaz."""
+        tasa_per = calcular_tasa_periodica(tasa_anual, frecuencia_pago, tipo_tasa)
+        cuota = calcular_cuota_constante(principal, tasa_per, n_periodos)
+        return cls(principal, tasa_per, cuota, n_periodos, frecuencia_pago, fecha_inicio, modo_fechas=modo_fechas)
+
+    # --- Consultas puntuales ---
+
+    def saldo_en(self, k: int, exacto: bool = True) -> float:
+        """Saldo al cierre del período k (k = 0 es el principal)."""
+        self._validar_periodo(k)
+        if exacto:
+            return self._saldo_exacto(k)
+        return round(self._saldo_cerrado(k), REDONDEO)
+
+    def interes_acumulado(self, k: int) -> float:
+        """Interés pagado desde el período 1 hasta el k inclusive."""
+        self._validar_periodo(k)
+        if k == 0:
+            return 0.0
+
+        # En las filas regulares interes = cuota - amortizacion, así que la suma se deduce
+        # del capital amortizado. La fila de cierre paga el saldo más su propio interés.
+        saldo_k = self._saldo_exacto(k)
+        if saldo_k > 0.0:
+            return round(k * self.cuota - self._amortizado(k), REDONDEO)
+
+        cierre = self._periodo_cierre()
+        saldo_previo = self._saldo_exacto(cierre - 1)
+        interes_cierre = round(saldo_previo * self.tasa_per, REDONDEO)
+        regulares = (cierre - 1) * self.cuota - self._amortizado(cierre - 1) if cierre > 1 else 0.0
+        return round(regulares + interes_cierre, REDONDEO)
+
+    def fila(self, periodo: int) -> Dict:
+        """Construye solo la fila del período indicado (1..n)."""
+        if not 1 <= periodo <= self.n_periodos:
+            raise IndexError("El período está fuera del rango de la tabla.")
+        return self._construir_fila(periodo, self._saldo_exacto(periodo - 1))
+
+    def materializar(self) -> TablaAmortizacion:
+        """Construye la tabla completa (equivale a generar_tabla_base)."""
+        return TablaAmortizacion.desde_filas(self)
+
+    # --- Interfaz de secuencia: las filas se construyen solo al recorrerlas ---
+
+    def __len__(self) -> int:
+        return self.n_periodos
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            inicio, fin, paso = idx.indices(self.n_periodos)
+            if paso != 1:
+                return [self[i] for i in range(inicio, fin, paso)]
+            return list(self._recorrer(inicio + 1, fin))
+        if idx < 0:
+            idx += self.n_periodos
+        return self.fila(idx + 1)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self._recorrer(1, self.n_periodos)
+
+    # --- Internos ---
+
+    def _validar_periodo(self, k: int):
+        if not 0 <= k <= self.n_periodos:
+            raise IndexError("El período está fuera del rango de la tabla.")
+
+    def _saldo_cerrado(self, k: int) -> float:
+        """Saldo teórico con interés sin redondear (fórmula de anualidad vencida)."""
+        if k >= self.n_periodos:
+            return 0.0
+        i = self.tasa_per
+        if i == 0:
+            return max(self.principal - k * self.cuota, 0.0)
+        factor = (1 + i) ** k
+        return max(self.principal * factor - self.cuota * (factor - 1) / i, 0.0)
+
+    def _saldo_exacto(self, k: int) -> float:
+        """Saldo de la tabla redondeada, avanzando desde el punto de control anterior a k."""
+        if k == 0:
+            return self.principal
+        j = k // self.paso_control
+        while len(self._controles) <= j:
+            ultimo = len(self._controles) - 1
+            desde = ultimo * self.paso_control
+            self._controles.append(self._avanzar(self._controles[ultimo], desde, desde + self.paso_control))
+        return self._avanzar(self._controles[j], j * self.paso_control, k)
+
+    def _avanzar(self, saldo: float, desde: int, hasta: int) -> float:
+        """Avanza el saldo redondeado del cierre del período `desde` al del período `hasta`."""
+        i, cuota, n = self.tasa_per, self.cuota, self.n_periodos
+        for periodo in range(desde + 1, min(hasta, n) + 1):
+            if periodo == n:
+                return 0.0
+            interes = round(saldo * i, REDONDEO)
+            saldo_final = round(saldo - round(cuota - interes, REDONDEO), REDONDEO)
+            if saldo_final < CERO_FINANCIERO:
+                return 0.0
+            saldo = saldo_final
+        return saldo
+
+    def _amortizado(self, k: int) -> float:
+        """Capital amortizado en las filas regulares 1..k.
+
+        Desde el período 2 los saldos están al centavo y cada amortización es la diferencia
+        exacta entre saldos; la del período 1 se toma de su fila, porque el redondeo del
+        primer saldo absorbe las fracciones de centavo del principal.
+        """
+        amortizacion_1 = round(self.cuota - round(self.principal * self.tasa_per, REDONDEO), REDONDEO)
+        return amortizacion_1 + self._saldo_exacto(1) - self._saldo_exacto(k)
+
+    def _periodo_cierre(self) -> int:
+        """Primer período cuyo saldo final es cero (búsqueda binaria sobre el saldo)."""
+        bajo, alto = 1, self.n_periodos
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            if self._saldo_exacto(medio) > 0.0:
+                bajo = medio + 1
+            else:
+                alto = medio
+        return bajo
+
+    def _construir_fila(self, periodo: int, saldo: float) -> Dict:
+        """Replica el cálculo de una fila de generar_tabla_base a partir del saldo inicial."""
+        interes = round(saldo * self.tasa_per, REDONDEO)
+        cuota_periodo = self.cuota
+        if periodo == self.n_periodos:
+            amortizacion = saldo
+            cuota_periodo = amortizacion + interes
+            saldo_final = 0.0
+        else:
+            amortizacion = round(self.cuota - interes, REDONDEO)
+            saldo_final = round(saldo - amortizacion, REDONDEO)
+        if saldo_final < CERO_FINANCIERO:
+            amortizacion = saldo
+            cuota_periodo = amortizacion + interes
+            saldo_final = 0.0
+
+        fecha = calendario.fecha_periodo(self.fecha_inicio, self.frecuencia_pago, periodo, self.modo_fechas)
+        return {
+            'periodo': periodo,
+            'fecha': calendario.formatear(fecha),
+            'saldo_inicial': round(saldo, REDONDEO),
+            'interes': interes,
+            'cuota_original': self.cuota,
+            'cuota_pagada': round(cuota_periodo, REDONDEO),
+            'amortizacion': amortizacion,
+            'abono_adhoc': 0.0,
+            'saldo_final': saldo_final,
+            'recalculado': False
+        }
+
+    def _recorrer(self, desde: int, hasta: int) -> Iterator[Dict]:
+        """Genera las filas de los períodos desde..hasta, una a la vez."""
+        if desde > hasta:
+            return
+        saldo = self._saldo_exacto(desde - 1)
+        for periodo in range(desde, hasta + 1):
+            fila = self._construir_fila(periodo, saldo)
+            saldo = fila['saldo_final']
+            yield fila
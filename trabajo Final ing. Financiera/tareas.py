@@ -0,0 +1,135 @@
+import queue
+import threading
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+
+class Cancelado(Exception):
+    """Se lanza dentro de la tarea cuando el usuario la cancela o sus datos quedan obsoletos."""
+
+
+class ControlTarea:
+    """Canal entre la tarea en segundo plano y la interfaz: progreso y cancelación."""
+
+    def __init__(self, id_tarea: int, cola: queue.Queue):
+        self.id_tarea = id_tarea
+        self._cola = cola
+        self._evento_cancelar = threading.Event()
+        self._ultimo_progreso = -1
+
+    def cancelar(self):
+        self._evento_cancelar.set()
+
+    @property
+    def cancelado(self) -> bool:
+        return self._evento_cancelar.is_set()
+
+    def verificar(self):
+        """Interrumpe la tarea si fue cancelada."""
+        if self._evento_cancelar.is_set():
+            raise Cancelado()
+
+    def progreso(self, fraccion: float):
+        """Informa el avance (0..1); solo envía cambios de al menos 1%."""
+        porcentaje = int(fraccion * 100)
+        if porcentaje != self._ultimo_progreso:
+            self._ultimo_progreso = porcentaje
+            self._cola.put(('progreso', self.id_tarea, porcentaje))
+
+    def recorrer(self, filas: Iterable, total: int, cada: int = 1024) -> Iterator:
+        """Recorre un iterable verificando la cancelación e informando el avance cada `cada` filas."""
+        for k, fila in enumerate(filas, start=1):
+            if k % cada == 0:
+                self.verificar()
+                self.progreso(k / total if total else 0.0)
+            yield fila
+        self.progreso(1.0)
+
+
+class TrabajadorCalculo:
+    """Ejecuta cálculos y exportaciones en un hilo, sin bloquear el bucle principal de Tk.
+
+    Los resultados vuelven por una cola que se revisa con `after()`, así los callbacks
+    siempre corren en el hilo de Tk. Solo hay una tarea vigente: iniciar otra, cancelar o
+    invalidar descarta los mensajes que aún lleguen de la anterior.
+    """
+
+    def __init__(self, master, intervalo_ms: int = 50):
+        self.master = master
+        self.intervalo_ms = intervalo_ms
+        self._cola: queue.Queue = queue.Queue()
+        self._contador = 0
+        self._control: Optional[ControlTarea] = None
+        self._callbacks = {}
+        self._revisando = False
+
+    @property
+    def ocupado(self) -> bool:
+        return self._control is not None
+
+    def ejecutar(self, funcion: Callable[[ControlTarea], Any], al_terminar: Callable[[Any], None],
+                 al_error: Callable[[Exception], None] = None, al_progreso: Callable[[int], None] = None,
+                 al_finalizar: Callable[[], None] = None) -> int:
+        """Lanza `funcion(control)` en un hilo y devuelve el identificador de la tarea."""
+        self.cancelar()
+        self._contador += 1
+        control = ControlTarea(self._contador, self._cola)
+        self._control = control
+        self._callbacks = {
+            'resultado': al_terminar,
+            'error': al_error,
+            'progreso': al_progreso,
+            'fin': al_finalizar,
+        }
+
+        def trabajo():
+            try:
+                self._cola.put(('resultado', control.id_tarea, funcion(control)))
+            except Cancelado:
+                self._cola.put(('cancelado', control.id_tarea, None))
+            except Exception as e:
+                self._cola.put(('error', control.id_tarea, e))
+
+        threading.Thread(target=trabajo, daemon=True).start()
+        if not self._revisando:
+            self._revisando = True
+            self.master.after(self.intervalo_ms, self._revisar)
+        return control.id_tarea
+
+    def cancelar(self):
+        """Cancela la tarea vigente; su resultado, si llega, se descarta."""
+        if self._control is not None:
+            self._control.cancelar()
+            self._terminar()
+
+    # Cambiar los parámetros a mitad de un cálculo deja su resultado obsoleto
+    invalidar = cancelar
+
+    def _terminar(self):
+        fin = self._callbacks.get('fin')
+        self._control = None
+        self._callbacks = {}
+        if fin:
+            fin()
+
+    def _revisar(self):
+        """Procesa los mensajes pendientes en el hilo de Tk (llamado con after)."""
+        try:
+            while True:
+                tipo, id_tarea, valor = self._cola.get_nowait()
+                if self._control is None or id_tarea != self._control.id_tarea:
+                    continue # Mensaje de una tarea cancelada u obsoleta
+                if tipo == 'progreso':
+                    if self._callbacks.get('progreso'):
+                        self._callbacks['progreso'](valor)
+                    continue
+                callback = self._callbacks.get(tipo)
+                self._terminar()
+                if callback:
+                    callback(valor)
+        except queue.Empty:
+            pass
+
+        if self._control is not None:
+            self.master.after(self.intervalo_ms, self._revisar)
+        else:
+            self._revisando = False
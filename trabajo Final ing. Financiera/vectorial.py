@@ -0,0 +1,30 @@
+import numpy as np
+
+from financiero import REDONDEO
+
+# Equivalentes vectorizados (numpy) de los cálculos del motor, compartidos por cartera,
+# objetivos y escenarios. Reproducen el resultado de financiero al centavo.
+
+
+def redondear(valores: np.ndarray) -> np.ndarray:
+    """Redondea a REDONDEO decimales con el mismo resultado que round() de Python."""
+    escala = 10.0 ** REDONDEO
+    escalado = valores * escala
+    resultado = np.rint(escalado) / escala
+
+    # np.rint trabaja sobre el valor ya escalado, que puede caer justo en un empate (x.5)
+    # que el valor original no tenía. En esos casos se delega a round() de Python.
+    fraccion = np.abs(escalado - np.floor(escalado) - 0.5)
+    dudosos = np.nonzero(fraccion <= 4 * np.spacing(np.abs(escalado)) + 1e-9)
+    for pos in zip(*dudosos):
+        resultado[pos] = round(float(valores[pos]), REDONDEO)
+    return resultado
+
+
+def cuota_constante(principales: np.ndarray, tasas_per: np.ndarray, n_periodos: np.ndarray) -> np.ndarray:
+    """Equivalente de financiero.calcular_cuota_constante (mismo orden de operaciones)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factor = (1 + tasas_per) ** n_periodos
+        cuota = np.where(tasas_per == 0, principales / n_periodos,
+                         principales * (tasas_per * factor) / (factor - 1))
+    return redondear(cuota)
@@ -0,0 +1,156 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Dict, Optional, Sequence, Tuple
+
+# Columnas visibles de la tabla de amortización
+COLUMNAS_VISTA = ('periodo', 'fecha', 'saldo_inicial', 'interes', 'cuota_pagada', 'amortizacion', 'abono_adhoc', 'saldo_final')
+
+
+class TablaVirtual:
+    """Treeview virtualizado para tablas de amortización largas.
+
+    Solo existen tantos items como filas caben en pantalla; al desplazarse se reasignan sus
+    valores. Los valores formateados se guardan para la ventana visible más un margen, y
+    `mostrar(tabla, desde_periodo)` invalida solo las filas desde el período recalculado,
+    de modo que Tk únicamente recibe las filas que cambiaron.
+    """
+
+    def __init__(self, master, filas_visibles: int = 20, margen: int = 100):
+        self.tree = ttk.Treeview(master, columns=COLUMNAS_VISTA, show='headings', height=filas_visibles)
+
+        # Configurar Encabezados
+        for col in COLUMNAS_VISTA:
+            self.tree.heading(col, text=col.replace('_', ' ').title())
+            self.tree.column(col, anchor='center', width=100)
+
+        # Configurar tags de estilo (ttk) una sola vez
+        self.tree.tag_configure('abono', background='#e0ffff', font=('Arial', 9, 'bold')) # Azul claro para abono
+        self.tree.tag_configure('recalculado', background='#fffacd') # Amarillo claro para filas recalculadas
+
+        # Scrollbar vertical: representa la tabla completa, no los items existentes
+        self.vsb = ttk.Scrollbar(master, orient="vertical", command=self._desplazar)
+        self.vsb.pack(side='right', fill='y')
+        self.tree.pack(fill="both", expand=True)
+
+        self.tree.bind('<Configure>', self._al_redimensionar)
+        self.tree.bind('<MouseWheel>', self._rueda)
+        self.tree.bind('<Button-4>', lambda e: self._mover(-3))
+        self.tree.bind('<Button-5>', lambda e: self._mover(3))
+        self.tree.bind('<Prior>', lambda e: self._mover(-self._filas_visibles))
+        self.tree.bind('<Next>', lambda e: self._mover(self._filas_visibles))
+
+        self._tabla: Sequence = ()
+        self._filas_visibles = filas_visibles
+        self._margen = margen
+        self._primera = 0
+        self._items = []                                # Items reutilizables del Treeview
+        self._mostrado: Dict[str, Tuple] = {}           # Valores actuales de cada item
+        self._formato: Dict[int, Tuple] = {}            # Índice de fila -> (valores, tags)
+
+    def mostrar(self, tabla: Sequence, desde_periodo: Optional[int] = None):
+        """Muestra la tabla. Con `desde_periodo`, las filas anteriores se dan por iguales."""
+        if desde_periodo is None:
+            self._formato.clear()
+        else:
+            desde = desde_periodo - 1
+            self._formato = {idx: v for idx, v in self._formato.items() if idx < desde}
+        self._tabla = tabla
+        self._primera = max(0, min(self._primera, len(tabla) - self._filas_visibles))
+        self._renderizar()
+        self.tree.after_idle(lambda: self._ajustar_filas(self.tree.winfo_height()))
+
+    def ir_a_periodo(self, periodo: int):
+        """Desplaza la vista para que la fila del período indicado quede arriba (si cabe)."""
+        self._ir_a(periodo - 1)
+
+    # --- Internos ---
+
+    def _valores(self, idx: int) -> Tuple:
+        """Valores formateados y tags de la fila idx (memorizados)."""
+        formato = self._formato.get(idx)
+        if formato is None:
+            fila = self._tabla[idx]
+            # Resaltar la fila de abono o la fila de re-cálculo
+            tags = ()
+            if fila.get('abono_adhoc', 0.0) > 0.0:
+                tags = ('abono',)
+            elif fila.get('recalculado', False) and fila['periodo'] > 1:
+                tags = ('recalculado',)
+            valores = (f"{fila['periodo']:}",
+                       fila['fecha'],
+                       f"{fila['saldo_inicial']:,.2f}",
+                       f"{fila['interes']:,.2f}",
+                       f"{fila['cuota_pagada']:,.2f}",
+                       f"{fila['amortizacion']:,.2f}",
+                       f"{fila['abono_adhoc']:,.2f}",
+                       f"{fila['saldo_final']:,.2f}")
+            formato = self._formato[idx] = (valores, tags)
+        return formato
+
+    def _renderizar(self):
+        """Ajusta el número de items y actualiza solo los que cambiaron."""
+        total = len(self._tabla)
+        necesarios = min(self._filas_visibles, total)
+        while len(self._items) < necesarios:
+            self._items.append(self.tree.insert('', tk.END, values=()))
+        while len(self._items) > necesarios:
+            iid = self._items.pop()
+            self._mostrado.pop(iid, None)
+            self.tree.delete(iid)
+
+        for k, iid in enumerate(self._items):
+            formato = self._valores(self._primera + k)
+            if self._mostrado.get(iid) != formato:
+                self.tree.item(iid, values=formato[0], tags=formato[1])
+                self._mostrado[iid] = formato
+
+        # Descartar formatos fuera de la ventana visible más el margen
+        if len(self._formato) > 2 * (self._filas_visibles + 2 * self._margen):
+            bajo = self._primera - self._margen
+            alto = self._primera + self._filas_visibles + self._margen
+            self._formato = {idx: v for idx, v in self._formato.items() if bajo <= idx < alto}
+
+        if total:
+            self.vsb.set(self._primera / total, (self._primera + necesarios) / total)
+        else:
+            self.vsb.set(0.0, 1.0)
+
+    def _mover(self, delta: int):
+        self._ir_a(self._primera + delta)
+        return 'break'
+
+    def _ir_a(self, primera: int):
+        primera = max(0, min(primera, len(self._tabla) - self._filas_visibles))
+        if primera != self._primera:
+            self._primera = primera
+            self._renderizar()
+
+    def _desplazar(self, *args):
+        """Comando del scrollbar: 'moveto fracción' o 'scroll n units|pages'."""
+        if args[0] == 'moveto':
+            self._ir_a(int(float(args[1]) * len(self._tabla)))
+        elif args[0] == 'scroll':
+            paso = self._filas_visibles if args[2] == 'pages' else 1
+            self._ir_a(self._primera + int(args[1]) * paso)
+
+    def _rueda(self, event):
+        # Windows entrega múltiplos de 120; macOS, valores pequeños
+        pasos = -event.delta // 120 if abs(event.delta) >= 120 else -event.delta
+        return self._mover(pasos * 3)
+
+    def _al_redimensionar(self, event):
+        self._ajustar_filas(event.height)
+
+    def _ajustar_filas(self, alto: int):
+        """Recalcula cuántas filas caben según la altura real del Treeview."""
+        if not self._items:
+            return
+        caja = self.tree.bbox(self._items[0])
+        if not caja:
+            return
+        encabezado, alto_fila = caja[1], caja[3]
+        visibles = max(1, (alto - encabezado) // max(alto_fila, 1))
+        if visibles != self._filas_visibles:
+            self._filas_visibles = visibles
+            self._primera = max(0, min(self._primera, len(self._tabla) - visibles))
+            self._renderizar()